@@ -20,6 +20,7 @@ from app.database import Base
 from app.models.user import User
 from app.models.habit import Habit
 from app.models.completion import Completion
+from app.models.completion_archive import CompletionArchive
 from app.models.achievement import Achievement
 
 # Alembic Config object
@@ -0,0 +1,46 @@
+"""
+Redis client configuration for caching and background pipelines.
+"""
+from typing import Optional
+from redis.asyncio import Redis
+from app.config import settings
+
+_redis_client: Optional[Redis] = None
+
+
+def create_redis_client() -> Redis:
+    """
+    Create a new async Redis client.
+
+    Clients are bound to the event loop they first run on, so code that
+    owns its own loop (e.g. Celery tasks) should create and close its own.
+    """
+    return Redis.from_url(str(settings.REDIS_URL), decode_responses=True)
+
+
+def get_redis_client() -> Redis:
+    """The API process's shared client, created on first use."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = create_redis_client()
+    return _redis_client
+
+
+async def close_redis_client() -> None:
+    """Close the shared client, if it was ever created."""
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+    _redis_client = None
+
+
+async def get_redis() -> Redis:
+    """
+    Dependency for getting the Redis client.
+
+    Usage:
+        @router.get("/items")
+        async def get_items(redis: Redis = Depends(get_redis)):
+            ...
+    """
+    return get_redis_client()
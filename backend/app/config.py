@@ -1,7 +1,8 @@
 """
 Application configuration using Pydantic Settings.
 """
-from typing import List, Union
+from functools import lru_cache
+from typing import List, Union, cast
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, RedisDsn, field_validator
 
@@ -30,6 +31,37 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = "redis://redis:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://redis:6379/2"
+    WORKER_DB_POOL_SIZE: int = 5
+    WORKER_DB_MAX_OVERFLOW: int = 5
+    WORKER_ASYNC_CONCURRENCY: int = 4
+
+    # User stats pipeline
+    STATS_BATCH_SIZE: int = 500
+    STATS_BATCH_INTERVAL_SECONDS: int = 30
+    STATS_CONCURRENT_BATCHES: int = 4
+    STATS_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+
+    # Leaderboards
+    LEADERBOARD_GROUP_CACHE_SECONDS: int = 60
+    LEADERBOARD_MAX_PAGE_SIZE: int = 100
+
+    # Write-behind check-ins
+    CHECKIN_WRITE_BEHIND: bool = False
+    CHECKIN_FLUSH_INTERVAL_MS: int = 250
+    CHECKIN_FLUSH_BATCH_SIZE: int = 500
+    CHECKIN_CLAIM_IDLE_MS: int = 30_000
+    CHECKIN_MAX_DELIVERIES: int = 5
+    CHECKIN_PENDING_TTL_SECONDS: int = 24 * 60 * 60
+
+    # Cold storage for archived habits and dormant users
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_MAX_BATCHES: int = 100
+    ARCHIVE_HABIT_GRACE_DAYS: int = 7
+    ARCHIVE_DORMANT_USER_DAYS: int = 180
+
+    # History import
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 100
 
     # Keycloak
     KEYCLOAK_URL: str
@@ -68,5 +100,18 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
+@lru_cache
+def get_settings() -> Settings:
+    """Load settings from the environment on first use."""
+    return Settings()
+
+
+class _LazySettings:
+    """Defers reading the environment until a setting is first accessed."""
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+
 # Global settings instance
-settings = Settings()
+settings = cast(Settings, _LazySettings())
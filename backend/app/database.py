@@ -1,34 +1,123 @@
 """
 Database configuration and session management.
+
+The engine and session factory are created on first use rather than at
+import, so importing models (Alembic, Celery workers, scripts) doesn't
+pay for settings, the async driver or a pool it may never use.
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from app.config import settings
-
-# Create async engine
-engine = create_async_engine(
-    str(settings.DATABASE_URL),
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
-
-# Create async session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+import logging
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, declarative_base
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
 
 # Base class for models
 Base = declarative_base()
 
+_engine: Optional["AsyncEngine"] = None
+_sessionmaker: Optional["async_sessionmaker"] = None
+
+# Session.info key for callbacks deferred until commit
+AFTER_COMMIT = "after_commit"
+
+
+def create_engine(**options) -> "AsyncEngine":
+    """Create an async engine for DATABASE_URL; keyword options override the defaults."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.config import settings
+
+    return create_async_engine(
+        str(settings.DATABASE_URL),
+        **{
+            "echo": settings.DEBUG,
+            "future": True,
+            "pool_pre_ping": True,
+            "pool_size": 10,
+            "max_overflow": 20,
+            **options,
+        },
+    )
+
+
+def create_sessionmaker(bind: "AsyncEngine") -> "async_sessionmaker":
+    """Create a session factory bound to an engine."""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+def get_engine() -> "AsyncEngine":
+    """The process-wide async engine, created on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine()
+    return _engine
+
+
+def get_sessionmaker() -> "async_sessionmaker":
+    """The process-wide session factory, created on first use."""
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = create_sessionmaker(get_engine())
+    return _sessionmaker
+
+
+async def dispose_engine() -> None:
+    """Close pooled connections, if the engine was ever created."""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessionmaker = None
+
+
+def after_commit(session: "AsyncSession", callback: Callable[[], Awaitable[None]]) -> None:
+    """
+    Run `callback` once the session's transaction is committed with
+    `commit()`, e.g. to touch Redis only for writes that stuck.
+    Callbacks are dropped if the transaction rolls back, and are best
+    effort: a failing one is logged and doesn't stop the others.
+    """
+    session.info.setdefault(AFTER_COMMIT, []).append(callback)
+
+
+async def commit(session: "AsyncSession") -> None:
+    """Commit, then run the callbacks registered with after_commit()."""
+    await session.commit()
+    for callback in session.info.pop(AFTER_COMMIT, []):
+        try:
+            await callback()
+        except Exception:
+            # The write is committed; don't fail the request over a side effect
+            logger.exception("After-commit callback failed")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_commit(session: Session, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(AFTER_COMMIT, None)
+
+
+def __getattr__(name: str):
+    # Keep `from app.database import engine, AsyncSessionLocal` working lazily
+    if name == "engine":
+        return get_engine()
+    if name == "AsyncSessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-async def get_db() -> AsyncSession:
+async def get_db() -> "AsyncSession":
     """
     Dependency for getting database sessions.
 
@@ -37,10 +126,10 @@ async def get_db() -> AsyncSession:
         async def get_items(db: AsyncSession = Depends(get_db)):
             ...
     """
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         try:
             yield session
-            await session.commit()
+            await commit(session)
         except Exception:
             await session.rollback()
             raise
@@ -1,31 +1,35 @@
 """
 Main FastAPI application entry point.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.config import settings
 
-# Create FastAPI app
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    description="Encore Habit Tracker API - Build core habits through streak-based gamification",
-    docs_url="/docs" if settings.DEBUG else None,
-    redoc_url="/redoc" if settings.DEBUG else None,
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-@app.get("/health", tags=["Health"])
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup and shutdown.
+
+    Database and Redis clients are created lazily on first use; shutdown
+    only closes the ones that were actually opened.
+    """
+    print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    print(f"📊 Environment: {settings.ENVIRONMENT}")
+    print(f"🔒 Debug mode: {settings.DEBUG}")
+
+    yield
+
+    from app.cache import close_redis_client
+    from app.database import dispose_engine
+
+    await close_redis_client()
+    await dispose_engine()
+    print(f"👋 Shutting down {settings.APP_NAME}")
+
+
 async def health_check():
     """Health check endpoint for monitoring."""
     return JSONResponse(
@@ -37,7 +41,6 @@ async def health_check():
     )
 
 
-@app.get("/", tags=["Root"])
 async def root():
     """Root endpoint."""
     return {
@@ -47,20 +50,34 @@ async def root():
     }
 
 
-# Include API routers (will be added in later sprints)
-# from app.api.v1.router import api_router
-# app.include_router(api_router, prefix=settings.API_V1_PREFIX)
+def create_app() -> FastAPI:
+    """Build the FastAPI application."""
+    app = FastAPI(
+        title=settings.APP_NAME,
+        version=settings.APP_VERSION,
+        description="Encore Habit Tracker API - Build core habits through streak-based gamification",
+        docs_url="/docs" if settings.DEBUG else None,
+        redoc_url="/redoc" if settings.DEBUG else None,
+        lifespan=lifespan,
+    )
 
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-@app.on_event("startup")
-async def startup_event():
-    """Actions to perform on application startup."""
-    print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    print(f"📊 Environment: {settings.ENVIRONMENT}")
-    print(f"🔒 Debug mode: {settings.DEBUG}")
+    app.add_api_route("/health", health_check, methods=["GET"], tags=["Health"])
+    app.add_api_route("/", root, methods=["GET"], tags=["Root"])
 
+    # Include API routers (will be added in later sprints)
+    # from app.api.v1.router import api_router
+    # app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Actions to perform on application shutdown."""
-    print(f"👋 Shutting down {settings.APP_NAME}")
+    return app
+
+
+app = create_app()
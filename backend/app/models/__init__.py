@@ -4,6 +4,7 @@ SQLAlchemy models for Encore Habit Tracker.
 from app.models.user import User, WeekStart, Theme
 from app.models.habit import Habit
 from app.models.completion import Completion
+from app.models.completion_archive import CompletionArchive
 from app.models.achievement import Achievement, AchievementType
 
 __all__ = [
@@ -12,6 +13,7 @@ __all__ = [
     "Theme",
     "Habit",
     "Completion",
+    "CompletionArchive",
     "Achievement",
     "AchievementType",
 ]
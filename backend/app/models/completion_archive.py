@@ -0,0 +1,59 @@
+"""
+Completion archive model: cold storage for a habit's completion history.
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import relationship
+from app.database import Base
+from datetime import datetime
+
+
+class CompletionArchive(Base):
+    """
+    Packed completion history for one habit, moved out of `completions`.
+
+    Days are stored as zlib-compressed bitmaps starting at start_date
+    (bit i is start_date + i days), so a year of history fits in a few
+    dozen bytes instead of hundreds of indexed rows.
+    """
+    __tablename__ = "completion_archives"
+
+    # One archive per habit
+    habit_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("habits.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    # Packed history
+    start_date = Column(Date, nullable=False, comment="Date of bit 0 in the bitmaps")
+    end_date = Column(Date, nullable=False, comment="Last archived date")
+    days = Column(LargeBinary, nullable=False, comment="zlib bitmap of completed or frozen days")
+    freezes = Column(LargeBinary, nullable=False, comment="zlib bitmap of days covered by a freeze")
+    manual = Column(LargeBinary, nullable=False, comment="zlib bitmap of manually logged days")
+    notes = Column(JSONB, nullable=True, comment="Sparse {YYYY-MM-DD: note}")
+    completion_count = Column(Integer, nullable=False, comment="Archived rows, freezes included")
+
+    # Why the history was moved: "archived" habit or "dormant" user
+    reason = Column(String(20), nullable=False)
+
+    # Metadata
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    habit = relationship("Habit", back_populates="completion_archive")
+
+    def __repr__(self):
+        return f"<CompletionArchive {self.habit_id} ({self.completion_count} days, {self.reason})>"
+
+    def to_dict(self):
+        """Convert archive summary to dictionary representation."""
+        return {
+            "habit_id": str(self.habit_id),
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
+            "completion_count": self.completion_count,
+            "packed_bytes": len(self.days) + len(self.freezes) + len(self.manual),
+            "reason": self.reason,
+            "archived_at": self.archived_at.isoformat(),
+        }
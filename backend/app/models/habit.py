@@ -48,6 +48,7 @@ class Habit(Base):
 
     # Status
     is_archived = Column(Boolean, default=False, nullable=False, comment="Soft delete flag")
+    history_archived_at = Column(DateTime, nullable=True, comment="Completions moved to cold storage")
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -57,6 +58,9 @@ class Habit(Base):
     # Relationships
     user = relationship("User", back_populates="habits")
     completions = relationship("Completion", back_populates="habit", cascade="all, delete-orphan")
+    completion_archive = relationship(
+        "CompletionArchive", back_populates="habit", uselist=False, cascade="all, delete-orphan"
+    )
 
     def __repr__(self):
         return f"<Habit '{self.name}' (streak: {self.current_streak}, user: {self.user_id})>"
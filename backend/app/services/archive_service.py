@@ -0,0 +1,278 @@
+"""
+Cold storage for completion history.
+
+Habits archived for ARCHIVE_HABIT_GRACE_DAYS, and the habits of users
+dormant for ARCHIVE_DORMANT_USER_DAYS, have their `completions` rows
+packed into one CompletionArchive row per habit and deleted from the hot
+table. Counters and streaks stay on `habits`, so dashboards and
+leaderboards are unchanged; only the day-by-day history moves.
+
+History is restored before anything writes to or recomputes a cold
+habit: logging a completion (direct or buffered) and importing do this
+themselves; unarchive and login paths must call unarchive_habit and
+restore_user. Exports read through both tiers.
+
+Only the day, freeze/manual flags and note survive a round trip:
+restored rows are stamped completed_at midnight and get a new created_at.
+"""
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.completion import Completion
+from app.models.completion_archive import CompletionArchive
+from app.models.habit import Habit
+from app.models.user import User
+
+REASON_ARCHIVED = "archived"
+REASON_DORMANT = "dormant"
+
+
+def pack_days(start: date, days: Iterable[date]) -> bytes:
+    """Compress a set of dates into a bitmap where bit i is start + i days."""
+    offsets = [(day - start).days for day in days]
+    bitmap = bytearray((max(offsets) // 8 + 1) if offsets else 0)
+    for offset in offsets:
+        bitmap[offset // 8] |= 1 << (offset % 8)
+    return zlib.compress(bytes(bitmap), 9)
+
+
+def unpack_days(start: date, packed: bytes) -> List[date]:
+    """Inverse of pack_days, in date order."""
+    days = []
+    for index, byte in enumerate(zlib.decompress(packed)):
+        for bit in range(8):
+            if byte & (1 << bit):
+                days.append(start + timedelta(days=index * 8 + bit))
+    return days
+
+
+class ArchiveService:
+    """Moves completion history between the hot table and cold storage."""
+
+    async def table_sizes(self, db: AsyncSession) -> Dict[str, int]:
+        """On-disk size in bytes of the completions table, its indexes and the archive."""
+        result = await db.execute(text(
+            "SELECT pg_total_relation_size('completions'), pg_indexes_size('completions'), "
+            "pg_total_relation_size('completion_archives')"
+        ))
+        total, indexes, archive = result.one()
+        return {"completions_total_bytes": total, "completions_index_bytes": indexes, "archive_total_bytes": archive}
+
+    async def find_candidates(
+        self,
+        db: AsyncSession,
+        limit: int,
+        now: Optional[datetime] = None,
+    ) -> Dict[UUID, str]:
+        """Up to `limit` habits whose history should go cold, with the reason."""
+        now = now or datetime.utcnow()
+        archived = await db.execute(
+            select(Habit.id).where(
+                Habit.is_archived.is_(True),
+                Habit.history_archived_at.is_(None),
+                Habit.updated_at < now - timedelta(days=settings.ARCHIVE_HABIT_GRACE_DAYS),
+            ).limit(limit)
+        )
+        candidates = dict.fromkeys(archived.scalars().all(), REASON_ARCHIVED)
+
+        if len(candidates) < limit:
+            dormant_since = now - timedelta(days=settings.ARCHIVE_DORMANT_USER_DAYS)
+            dormant = await db.execute(
+                select(Habit.id)
+                .join(User, User.id == Habit.user_id)
+                .where(
+                    Habit.is_archived.is_(False),
+                    Habit.history_archived_at.is_(None),
+                    func.coalesce(User.last_login_at, User.created_at) < dormant_since,
+                    func.coalesce(Habit.last_completed_at, Habit.created_at) < dormant_since,
+                )
+                .limit(limit - len(candidates))
+            )
+            candidates.update(dict.fromkeys(dormant.scalars().all(), REASON_DORMANT))
+
+        return candidates
+
+    async def archive_habits(
+        self,
+        db: AsyncSession,
+        reasons: Dict[UUID, str],
+        now: Optional[datetime] = None,
+    ) -> int:
+        """
+        Pack and remove the completions of the given habits, inside the
+        caller's transaction. Returns the number of rows moved.
+
+        The archive is built from the rows the DELETE returns, so a
+        completion committed concurrently is either archived or left in
+        the hot table, never lost.
+        """
+        if not reasons:
+            return 0
+        now = now or datetime.utcnow()
+        habit_ids = list(reasons)
+
+        result = await db.execute(
+            delete(Completion)
+            .where(Completion.habit_id.in_(habit_ids))
+            .returning(
+                Completion.habit_id,
+                Completion.date,
+                Completion.used_freeze,
+                Completion.is_manual,
+                Completion.note,
+            )
+        )
+        history = defaultdict(list)
+        for row in result.all():
+            history[row.habit_id].append(row)
+
+        archives = []
+        for habit_id, rows in history.items():
+            start = min(row.date for row in rows)
+            notes = {row.date.isoformat(): row.note for row in rows if row.note}
+            archives.append({
+                "habit_id": habit_id,
+                "start_date": start,
+                "end_date": max(row.date for row in rows),
+                "days": pack_days(start, (row.date for row in rows)),
+                "freezes": pack_days(start, (row.date for row in rows if row.used_freeze)),
+                "manual": pack_days(start, (row.date for row in rows if row.is_manual)),
+                "notes": notes or None,
+                "completion_count": len(rows),
+                "reason": reasons[habit_id],
+                "archived_at": now,
+            })
+        if archives:
+            await db.execute(insert(CompletionArchive), archives)
+
+        # Keep updated_at: it's when the habit was archived, not its history
+        await db.execute(
+            update(Habit)
+            .where(Habit.id.in_(habit_ids))
+            .values(history_archived_at=now, updated_at=Habit.updated_at)
+        )
+        return sum(archive["completion_count"] for archive in archives)
+
+    async def archive_batch(
+        self,
+        db: AsyncSession,
+        batch_size: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """Find and archive one batch of candidate habits."""
+        candidates = await self.find_candidates(db, batch_size or settings.ARCHIVE_BATCH_SIZE, now)
+        moved = await self.archive_habits(db, candidates, now)
+        return {"habits": len(candidates), "completions": moved}
+
+    def unpack(self, archive: CompletionArchive) -> List[dict]:
+        """An archive's completions as rows for the completions table."""
+        freezes = set(unpack_days(archive.start_date, archive.freezes))
+        manual = set(unpack_days(archive.start_date, archive.manual))
+        notes = archive.notes or {}
+        return [
+            {
+                "habit_id": archive.habit_id,
+                "date": day,
+                "completed_at": datetime.combine(day, datetime.min.time()),
+                "used_freeze": day in freezes,
+                "is_manual": day in manual,
+                "note": notes.get(day.isoformat()),
+            }
+            for day in unpack_days(archive.start_date, archive.days)
+        ]
+
+    async def has_archived_day(self, db: AsyncSession, habit_id: UUID, day: date) -> bool:
+        """Whether a habit's cold history includes `day`, without restoring it."""
+        archive = await db.get(CompletionArchive, habit_id)
+        if archive is None or not archive.start_date <= day <= archive.end_date:
+            return False
+        return day in unpack_days(archive.start_date, archive.days)
+
+    async def restore_habits(self, db: AsyncSession, habit_ids: Iterable[UUID]) -> int:
+        """
+        Move cold history back into `completions`, inside the caller's
+        transaction. Returns the number of rows restored.
+        """
+        habit_ids = list(habit_ids)
+        if not habit_ids:
+            return 0
+
+        result = await db.execute(
+            select(CompletionArchive).where(CompletionArchive.habit_id.in_(habit_ids))
+        )
+        rows = [row for archive in result.scalars().all() for row in self.unpack(archive)]
+        if rows:
+            await db.execute(
+                insert(Completion).on_conflict_do_nothing(constraint="unique_habit_date_completion"),
+                rows,
+            )
+
+        await db.execute(delete(CompletionArchive).where(CompletionArchive.habit_id.in_(habit_ids)))
+        await db.execute(
+            update(Habit)
+            .where(Habit.id.in_(habit_ids))
+            .values(history_archived_at=None, updated_at=Habit.updated_at)
+        )
+        return len(rows)
+
+    async def restore_user(self, db: AsyncSession, user_id: UUID) -> int:
+        """Restore a returning user's active habits. Cheap when nothing is cold."""
+        result = await db.execute(
+            select(Habit.id).where(
+                Habit.user_id == user_id,
+                Habit.is_archived.is_(False),
+                Habit.history_archived_at.is_not(None),
+            )
+        )
+        return await self.restore_habits(db, result.scalars().all())
+
+    async def unarchive_habit(self, db: AsyncSession, habit: Habit) -> Habit:
+        """Un-archive a habit, bringing its history back first."""
+        if habit.history_archived_at is not None:
+            await self.restore_habits(db, [habit.id])
+        habit.is_archived = False
+        return habit
+
+    async def export_history(self, db: AsyncSession, habit: Habit) -> List[dict]:
+        """
+        A habit's full history from both tiers, oldest first, without
+        restoring it. Cold rows have no completed_at (None).
+        """
+        result = await db.execute(
+            select(
+                Completion.habit_id,
+                Completion.date,
+                Completion.completed_at,
+                Completion.used_freeze,
+                Completion.is_manual,
+                Completion.note,
+            ).where(Completion.habit_id == habit.id)
+        )
+        rows = [dict(row._mapping) for row in result.all()]
+
+        if habit.history_archived_at is not None:
+            archive = await db.get(CompletionArchive, habit.id)
+            if archive is not None:
+                rows.extend({**row, "completed_at": None} for row in self.unpack(archive))
+
+        rows.sort(key=lambda row: row["date"])
+        return [
+            {
+                "date": row["date"].isoformat(),
+                "completed_at": row["completed_at"].isoformat() if row["completed_at"] else None,
+                "used_freeze": row["used_freeze"],
+                "is_manual": row["is_manual"],
+                "note": row["note"],
+            }
+            for row in rows
+        ]
+
+
+# Global service instance
+archive_service = ArchiveService()
@@ -0,0 +1,227 @@
+"""
+Write-behind buffer for check-ins.
+
+With CHECKIN_WRITE_BEHIND enabled, a check-in is acknowledged once it has
+been appended to a Redis stream; a flusher (app.worker.checkin_flusher)
+reads the stream through a consumer group and writes completions to
+Postgres in batches.
+
+Keys:
+    checkins:stream               Stream of buffered check-ins
+    checkins:pending:<user_id>    Hash of habit_id:date -> submitted_at for
+                                  check-ins not yet flushed, for dedupe and
+                                  read-your-writes
+    checkins:dead                 Stream of entries that couldn't be parsed,
+                                  or were delivered CHECKIN_MAX_DELIVERIES
+                                  times without being written, with a reason
+
+An entry is acknowledged and removed from the stream only after its batch
+commits, so a crashed flusher's entries are claimed and replayed by
+another; the insert ignores (habit_id, date) conflicts, making a replay
+harmless. An entry that keeps failing is moved to the dead-letter stream
+instead of being replayed forever.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from uuid import UUID
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from app.config import settings
+
+CHECKIN_STREAM_KEY = "checkins:stream"
+CHECKIN_GROUP = "checkin-flushers"
+CHECKIN_DEAD_LETTER_KEY = "checkins:dead"
+
+logger = logging.getLogger(__name__)
+
+
+def pending_key(user_id: Union[UUID, str]) -> str:
+    """Redis hash of a user's check-ins that haven't reached Postgres yet."""
+    return f"checkins:pending:{user_id}"
+
+
+def pending_field(habit_id: Union[UUID, str], completion_date: date) -> str:
+    return f"{habit_id}:{completion_date.isoformat()}"
+
+
+@dataclass(frozen=True)
+class BufferedCheckin:
+    """One check-in read back from the stream."""
+    entry_id: str
+    user_id: UUID
+    habit_id: UUID
+    date: date
+    completed_at: datetime
+    note: Optional[str] = None
+
+    @classmethod
+    def from_entry(cls, entry_id: str, fields: Dict[str, str]) -> "BufferedCheckin":
+        return cls(
+            entry_id=entry_id,
+            user_id=UUID(fields["user_id"]),
+            habit_id=UUID(fields["habit_id"]),
+            date=date.fromisoformat(fields["date"]),
+            completed_at=datetime.fromisoformat(fields["completed_at"]),
+            note=fields.get("note") or None,
+        )
+
+
+class CheckinBuffer:
+    """Redis stream buffer between the check-in API and Postgres."""
+
+    async def ensure_group(self, redis: Redis) -> None:
+        """Create the stream and consumer group if they don't exist yet."""
+        try:
+            await redis.xgroup_create(CHECKIN_STREAM_KEY, CHECKIN_GROUP, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def append(
+        self,
+        redis: Redis,
+        user_id: UUID,
+        habit_id: UUID,
+        completion_date: date,
+        note: Optional[str] = None,
+    ) -> bool:
+        """
+        Buffer a check-in. Returns False if one for the same habit and
+        date is already waiting to be flushed.
+        """
+        key = pending_key(user_id)
+        field = pending_field(habit_id, completion_date)
+        submitted_at = datetime.utcnow().isoformat()
+        if not await redis.hsetnx(key, field, submitted_at):
+            return False
+
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.xadd(
+                    CHECKIN_STREAM_KEY,
+                    {
+                        "user_id": str(user_id),
+                        "habit_id": str(habit_id),
+                        "date": completion_date.isoformat(),
+                        "completed_at": submitted_at,
+                        "note": (note or "")[:500],
+                    },
+                )
+                pipe.expire(key, settings.CHECKIN_PENDING_TTL_SECONDS)
+                await pipe.execute()
+        except Exception:
+            await redis.hdel(key, field)
+            raise
+        return True
+
+    async def get_pending(self, redis: Redis, user_id: Union[UUID, str]) -> Dict[UUID, Set[date]]:
+        """A user's unflushed check-in dates, by habit."""
+        pending: Dict[UUID, Set[date]] = {}
+        for field in await redis.hkeys(pending_key(user_id)):
+            habit_id, _, day = field.rpartition(":")
+            pending.setdefault(UUID(habit_id), set()).add(date.fromisoformat(day))
+        return pending
+
+    async def read(
+        self,
+        redis: Redis,
+        consumer: str,
+        count: Optional[int] = None,
+        block_ms: Optional[int] = None,
+    ) -> List[BufferedCheckin]:
+        """
+        Read up to `count` check-ins for this consumer.
+
+        Entries left unacknowledged by a consumer for longer than
+        CHECKIN_CLAIM_IDLE_MS (e.g. a flusher that died mid-batch) are
+        claimed first. Claimed entries delivered more than
+        CHECKIN_MAX_DELIVERIES times, and entries that don't parse, are
+        dead-lettered rather than returned.
+        """
+        count = count or settings.CHECKIN_FLUSH_BATCH_SIZE
+        claimed = await redis.xautoclaim(
+            CHECKIN_STREAM_KEY,
+            CHECKIN_GROUP,
+            consumer,
+            min_idle_time=settings.CHECKIN_CLAIM_IDLE_MS,
+            start_id="0-0",
+            count=count,
+        )
+        # [next start id, entries, deleted ids]; entries trimmed meanwhile come back empty
+        entries = [entry for entry in claimed[1] if entry[1]]
+        dead: List[Tuple[str, Dict[str, str], str]] = []
+
+        if entries:
+            async with redis.pipeline(transaction=False) as pipe:
+                for entry_id, _ in entries:
+                    pipe.xpending_range(CHECKIN_STREAM_KEY, CHECKIN_GROUP, min=entry_id, max=entry_id, count=1)
+                pending = await pipe.execute()
+            deliveries = {info["message_id"]: info["times_delivered"] for infos in pending for info in infos}
+            retried = []
+            for entry_id, fields in entries:
+                times = deliveries.get(entry_id, 0)
+                if times > settings.CHECKIN_MAX_DELIVERIES:
+                    dead.append((entry_id, fields, f"delivered {times} times"))
+                else:
+                    retried.append((entry_id, fields))
+            entries = retried
+
+        if len(entries) < count:
+            response = await redis.xreadgroup(
+                CHECKIN_GROUP,
+                consumer,
+                {CHECKIN_STREAM_KEY: ">"},
+                count=count - len(entries),
+                block=block_ms,
+            )
+            for _, stream_entries in response or []:
+                entries.extend(stream_entries)
+
+        checkins = []
+        for entry_id, fields in entries:
+            try:
+                checkins.append(BufferedCheckin.from_entry(entry_id, fields))
+            except (KeyError, ValueError) as exc:
+                dead.append((entry_id, fields, f"unparseable: {exc!r}"))
+
+        if dead:
+            await self.dead_letter(redis, dead)
+        return checkins
+
+    async def dead_letter(self, redis: Redis, entries: Iterable[Tuple[str, Dict[str, str], str]]) -> None:
+        """Move (entry_id, fields, reason) entries out of the buffer into the dead-letter stream."""
+        entries = list(entries)
+        async with redis.pipeline(transaction=False) as pipe:
+            for entry_id, fields, reason in entries:
+                logger.warning("Dead-lettering check-in %s: %s", entry_id, reason)
+                pipe.xadd(CHECKIN_DEAD_LETTER_KEY, {**fields, "entry_id": entry_id, "reason": reason})
+                if "user_id" in fields and "habit_id" in fields and "date" in fields:
+                    pipe.hdel(pending_key(fields["user_id"]), f"{fields['habit_id']}:{fields['date']}")
+            entry_ids = [entry_id for entry_id, _, _ in entries]
+            pipe.xack(CHECKIN_STREAM_KEY, CHECKIN_GROUP, *entry_ids)
+            pipe.xdel(CHECKIN_STREAM_KEY, *entry_ids)
+            await pipe.execute()
+
+    async def acknowledge(self, redis: Redis, checkins: Iterable[BufferedCheckin]) -> None:
+        """Drop flushed check-ins from the stream and the pending overlay."""
+        checkins = list(checkins)
+        if not checkins:
+            return
+
+        entry_ids = [checkin.entry_id for checkin in checkins]
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.xack(CHECKIN_STREAM_KEY, CHECKIN_GROUP, *entry_ids)
+            pipe.xdel(CHECKIN_STREAM_KEY, *entry_ids)
+            for checkin in checkins:
+                pipe.hdel(pending_key(checkin.user_id), pending_field(checkin.habit_id, checkin.date))
+            await pipe.execute()
+
+    async def backlog(self, redis: Redis) -> int:
+        """Check-ins buffered but not yet flushed."""
+        return await redis.xlen(CHECKIN_STREAM_KEY)
+
+
+# Global service instance
+checkin_buffer = CheckinBuffer()
@@ -0,0 +1,312 @@
+"""
+Completion service: the check-in write path.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.achievement import Achievement, AchievementType
+from app.models.completion import Completion
+from app.database import after_commit
+from app.models.habit import Habit
+from app.services.archive_service import archive_service
+from app.services.checkin_buffer import BufferedCheckin, checkin_buffer
+from app.services.leaderboard_service import leaderboard_service
+from app.services.stats_service import stats_service
+from app.services.streak_service import streak_service
+
+STREAK_ACHIEVEMENTS = {
+    7: AchievementType.STREAK_7,
+    14: AchievementType.STREAK_14,
+    30: AchievementType.STREAK_30,
+    50: AchievementType.STREAK_50,
+    100: AchievementType.STREAK_100,
+}
+
+
+class CompletionService:
+    """Logs completions and keeps habit counters, streaks and achievements in sync."""
+
+    async def get_completion(self, db: AsyncSession, habit_id, completion_date: date) -> Optional[Completion]:
+        result = await db.execute(
+            select(Completion).where(Completion.habit_id == habit_id, Completion.date == completion_date)
+        )
+        return result.scalar_one_or_none()
+
+    async def log_completion(
+        self,
+        db: AsyncSession,
+        habit: Habit,
+        completion_date: date,
+        note: Optional[str] = None,
+        redis: Optional[Redis] = None,
+        today: Optional[date] = None,
+    ) -> Completion:
+        """
+        Log a completion for a habit on a date.
+
+        Idempotent per (habit, date): a repeated or concurrent check-in
+        returns the existing completion unchanged. The habit row is locked
+        and reloaded first, so concurrent check-ins for other dates don't
+        overwrite each other's counters. Stats and leaderboards are only
+        updated once the caller commits with app.database.commit().
+        """
+        await db.refresh(habit, with_for_update=True)
+        if habit.history_archived_at is not None:
+            await archive_service.restore_habits(db, [habit.id])
+
+        completion = await db.scalar(
+            insert(Completion)
+            .values(habit_id=habit.id, date=completion_date, note=note, is_manual=True)
+            .on_conflict_do_nothing(constraint="unique_habit_date_completion")
+            .returning(Completion)
+        )
+        if completion is None:
+            return await self.get_completion(db, habit.id, completion_date)
+
+        completed_at = datetime.combine(completion_date, datetime.min.time())
+        habit.total_completions += 1
+        if habit.last_completed_at is None or habit.last_completed_at < completed_at:
+            habit.last_completed_at = completed_at
+        await db.flush()
+
+        await streak_service.recalculate_streak(db, habit, today)
+        await self.award_streak_achievements(db, habit)
+
+        if redis is not None:
+            user_id = habit.user_id
+            after_commit(db, lambda: stats_service.mark_user_dirty(redis, user_id))
+            after_commit(db, lambda: leaderboard_service.record_completion(db, redis, user_id, completion_date, today))
+
+        return completion
+
+    async def check_in(
+        self,
+        db: AsyncSession,
+        habit: Habit,
+        completion_date: date,
+        note: Optional[str] = None,
+        redis: Optional[Redis] = None,
+        today: Optional[date] = None,
+    ) -> dict:
+        """
+        Check in a habit for a date and report its new counters.
+
+        With CHECKIN_WRITE_BEHIND the completion is only appended to the
+        Redis buffer ("pending") and the counters are estimated from the
+        habit row without touching its history; the flusher writes it and
+        recomputes them. Otherwise it's written now ("completed").
+        """
+        if not settings.CHECKIN_WRITE_BEHIND or redis is None:
+            await self.log_completion(db, habit, completion_date, note, redis, today)
+            return self._check_in_result(
+                habit, completion_date, "completed",
+                habit.current_streak, habit.best_streak, habit.total_completions,
+            )
+
+        pending = (await checkin_buffer.get_pending(redis, habit.user_id)).get(habit.id, set())
+        if await self._is_logged(db, habit, completion_date):
+            status = "completed"
+        else:
+            await checkin_buffer.append(redis, habit.user_id, habit.id, completion_date, note)
+            pending.add(completion_date)
+            status = "pending"
+
+        return self._check_in_result(
+            habit, completion_date, status, *self._overlay(habit, pending, today)
+        )
+
+    async def _is_logged(self, db: AsyncSession, habit: Habit, completion_date: date) -> bool:
+        """
+        Whether the habit already has a completion (or freeze) on the date:
+        a point lookup on (habit_id, date), plus the archive for cold
+        history, which isn't restored here.
+        """
+        if habit.last_completed_at is not None and completion_date == habit.last_completed_at.date():
+            return True
+        if await self.get_completion(db, habit.id, completion_date) is not None:
+            return True
+        if habit.history_archived_at is not None:
+            return await archive_service.has_archived_day(db, habit.id, completion_date)
+        return False
+
+    def _check_in_result(
+        self,
+        habit: Habit,
+        completion_date: date,
+        status: str,
+        current_streak: int,
+        best_streak: int,
+        total_completions: int,
+    ) -> dict:
+        return {
+            "habit_id": str(habit.id),
+            "date": completion_date.isoformat(),
+            "status": status,
+            "current_streak": current_streak,
+            "best_streak": best_streak,
+            "total_completions": total_completions,
+        }
+
+    def _overlay(
+        self,
+        habit: Habit,
+        pending: Set[date],
+        today: Optional[date] = None,
+    ) -> Tuple[int, int, int]:
+        """
+        Estimated (current, best, total) for a habit once its pending
+        check-ins are flushed, from its counters and last completion.
+
+        Days after the last completion extend the streak when consecutive
+        and restart it otherwise; earlier days only add to the total.
+        Freezes and older history aren't visible here, so a streak bridged
+        by a freeze or revived by a backfill reads low until the flusher
+        recomputes it.
+        """
+        today = today or date.today()
+        last = habit.last_completed_at.date() if habit.last_completed_at is not None else None
+        new_days = pending - {last}
+        if not new_days:
+            return habit.current_streak, habit.best_streak, habit.total_completions
+
+        current, best, run_end = habit.current_streak or 0, habit.best_streak or 0, last
+        for day in sorted(new_days):
+            if last is not None and day < last:
+                continue
+            current = current + 1 if run_end is not None and day == run_end + timedelta(days=1) else 1
+            best = max(best, current)
+            run_end = day
+
+        if run_end is None or run_end < today - timedelta(days=1):
+            current = 0
+        return current, best, habit.total_completions + len(new_days)
+
+    async def with_pending(
+        self,
+        redis: Redis,
+        user_id: UUID,
+        habits: Iterable[Habit],
+        today: Optional[date] = None,
+    ) -> List[dict]:
+        """
+        Serialize a user's habits including check-ins still in the buffer,
+        so the user reads back their own writes before they're flushed.
+        """
+        habits = list(habits)
+        pending = await checkin_buffer.get_pending(redis, user_id) if settings.CHECKIN_WRITE_BEHIND else {}
+
+        serialized = []
+        for habit in habits:
+            data = habit.to_dict()
+            if habit.id in pending:
+                current, best, total = self._overlay(habit, pending[habit.id], today)
+                data.update(current_streak=current, best_streak=best, total_completions=total)
+            serialized.append(data)
+        return serialized
+
+    async def log_buffered_completions(
+        self,
+        db: AsyncSession,
+        checkins: Iterable[BufferedCheckin],
+        today: Optional[date] = None,
+    ) -> List[BufferedCheckin]:
+        """
+        Write a batch of buffered check-ins inside the caller's transaction.
+
+        Completions go in as one multi-row INSERT ... ON CONFLICT DO NOTHING,
+        counters and streaks are recomputed with one UPDATE for all affected
+        habits, and achievements are checked for the batch at once. Returns
+        the check-ins that created a completion; duplicates and check-ins
+        for habits deleted meanwhile are skipped.
+
+        The habits are locked (in id order) before anything is inserted, so
+        concurrent flushers, imports and check-ins on the same habit queue
+        up instead of recomputing counters from stale snapshots.
+        """
+        unique: Dict[Tuple[UUID, date], BufferedCheckin] = {}
+        for checkin in checkins:
+            unique.setdefault((checkin.habit_id, checkin.date), checkin)
+        if not unique:
+            return []
+
+        result = await db.execute(
+            select(Habit.id, Habit.user_id, Habit.history_archived_at)
+            .where(Habit.id.in_({habit_id for habit_id, _ in unique}))
+            .order_by(Habit.id)
+            .with_for_update()
+        )
+        habits = result.all()
+        owners = {habit_id: user_id for habit_id, user_id, _ in habits}
+        await archive_service.restore_habits(db, [habit_id for habit_id, _, cold in habits if cold is not None])
+        rows = [
+            {
+                "habit_id": checkin.habit_id,
+                "date": checkin.date,
+                "completed_at": checkin.completed_at,
+                "note": checkin.note,
+                "is_manual": True,
+            }
+            for checkin in unique.values()
+            if owners.get(checkin.habit_id) == checkin.user_id
+        ]
+        if not rows:
+            return []
+
+        result = await db.execute(
+            insert(Completion)
+            .on_conflict_do_nothing(constraint="unique_habit_date_completion")
+            .returning(Completion.habit_id, Completion.date),
+            rows,
+        )
+        inserted = [unique[(habit_id, day)] for habit_id, day in result.all()]
+        if not inserted:
+            return []
+
+        affected = {checkin.habit_id for checkin in inserted}
+        await streak_service.recalculate_streaks(db, affected, today)
+
+        result = await db.execute(
+            select(Habit).where(Habit.id.in_(affected)).execution_options(populate_existing=True)
+        )
+        await self.award_streak_achievements_for(db, result.scalars().all())
+        return inserted
+
+    async def award_streak_achievements(self, db: AsyncSession, habit: Habit) -> list:
+        """Unlock any streak milestones the habit just reached."""
+        return await self.award_streak_achievements_for(db, [habit])
+
+    async def award_streak_achievements_for(self, db: AsyncSession, habits: Iterable[Habit]) -> list:
+        """Unlock streak milestones for many habits with a single lookup."""
+        reached = {
+            habit.id: (habit, [kind for days, kind in STREAK_ACHIEVEMENTS.items() if habit.current_streak >= days])
+            for habit in habits
+        }
+        reached = {habit_id: entry for habit_id, entry in reached.items() if entry[1]}
+        if not reached:
+            return []
+
+        result = await db.execute(
+            select(Achievement.habit_id, Achievement.type).where(
+                Achievement.habit_id.in_(reached.keys()),
+                Achievement.type.in_(STREAK_ACHIEVEMENTS.values()),
+            )
+        )
+        unlocked = set(result.all())
+
+        awarded = [
+            Achievement(user_id=habit.user_id, habit_id=habit.id, type=kind)
+            for habit, kinds in reached.values()
+            for kind in kinds
+            if (habit.id, kind) not in unlocked
+        ]
+        db.add_all(awarded)
+        return awarded
+
+
+# Global service instance
+completion_service = CompletionService()
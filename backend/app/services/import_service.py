@@ -0,0 +1,320 @@
+"""
+Bulk import of habit history from other trackers.
+
+Rows are parsed and validated as a stream, loaded in batches with
+asyncpg's COPY into a temporary staging table, and merged into
+`completions` with a single INSERT ... ON CONFLICT (habit_id, date).
+Habit counters are then recomputed for all affected habits in one
+set-based UPDATE (StreakService.recalculate_streaks).
+
+Supported formats:
+    loop  Loop Habit Tracker export (the zip, or its Checkmarks.csv)
+    csv   Generic CSV with a header: habit,date[,freeze][,note]
+    json  JSON Lines (streamed) or a JSON array of {habit, date, freeze, note}
+"""
+import csv
+import io
+import json
+import time
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.habit import Habit
+from app.models.user import User
+from app.services.archive_service import archive_service
+from app.services.streak_service import streak_service
+
+# Loop Habit Tracker checkmark values
+LOOP_YES_MANUAL = "2"
+LOOP_SKIP = "3"
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+
+STAGING_TABLE = "completion_import"
+STAGING_COLUMNS = ["habit_id", "date", "used_freeze", "note"]
+
+MERGE_SQL = text(f"""
+    INSERT INTO completions
+        (id, habit_id, date, completed_at, used_freeze, is_manual, note, created_at, updated_at)
+    SELECT DISTINCT ON (s.habit_id, s.date)
+        gen_random_uuid(), s.habit_id, s.date, s.date::timestamp, s.used_freeze, false, s.note,
+        now() at time zone 'utc', now() at time zone 'utc'
+    FROM {STAGING_TABLE} AS s
+    ORDER BY s.habit_id, s.date, s.used_freeze
+    ON CONFLICT (habit_id, date) DO NOTHING
+""")
+
+
+class ImportRowError(ValueError):
+    """A source row that failed validation."""
+
+
+@dataclass(frozen=True)
+class ImportRow:
+    """One validated completion to import."""
+    habit_name: str
+    date: date
+    used_freeze: bool = False
+    note: Optional[str] = None
+
+
+@dataclass
+class ImportResult:
+    """Summary of an import run."""
+    rows_read: int = 0
+    rows_invalid: int = 0
+    rows_staged: int = 0
+    completions_created: int = 0
+    habits_created: int = 0
+    habits_affected: int = 0
+    errors: List[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self):
+        """Convert result to dictionary representation."""
+        return {
+            "rows_read": self.rows_read,
+            "rows_invalid": self.rows_invalid,
+            "rows_staged": self.rows_staged,
+            "completions_created": self.completions_created,
+            "duplicates_skipped": self.rows_staged - self.completions_created,
+            "habits_created": self.habits_created,
+            "habits_affected": self.habits_affected,
+            "errors": self.errors,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+        }
+
+
+# ----------------------------------------
+# Parsers: yield (line number, raw fields)
+# ----------------------------------------
+
+def parse_loop_csv(lines: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    """
+    Parse Loop's wide Checkmarks.csv: Date,<habit>,<habit>,...
+
+    Only manual check-ins become completions and skips become freezes;
+    automatic (frequency-implied), missed and unknown days are dropped.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if not header:
+        return
+    habits = [name.strip() for name in header[1:]]
+
+    for row in reader:
+        for name, value in zip(habits, row[1:]):
+            value = value.strip()
+            if not name or value not in (LOOP_YES_MANUAL, LOOP_SKIP):
+                continue
+            yield reader.line_num, {"habit": name, "date": row[0], "freeze": value == LOOP_SKIP}
+
+
+def parse_generic_csv(lines: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    """Parse a CSV with a header row naming habit, date, and optional freeze/note columns."""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, {key.strip().lower(): value for key, value in row.items() if key}
+
+
+def parse_generic_json(lines: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    """
+    Parse JSON Lines, one object per line, streaming.
+
+    A top-level JSON array is also accepted, but is loaded whole.
+    """
+    numbered = enumerate(lines, start=1)
+    for first_number, first in numbered:
+        if first.strip():
+            break
+    else:
+        return
+
+    if first.lstrip().startswith("["):
+        records = json.loads(first + "".join(line for _, line in numbered))
+        for index, record in enumerate(records, start=1):
+            yield index, record if isinstance(record, dict) else {"_error": "expected a JSON object"}
+        return
+
+    yield first_number, _load_json_line(first)
+    for line_number, line in numbered:
+        if line.strip():
+            yield line_number, _load_json_line(line)
+
+
+def _load_json_line(line: str) -> dict:
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as exc:
+        return {"_error": f"invalid JSON ({exc.msg})"}
+    return record if isinstance(record, dict) else {"_error": "expected a JSON object"}
+
+
+PARSERS = {
+    "loop": parse_loop_csv,
+    "csv": parse_generic_csv,
+    "json": parse_generic_json,
+}
+
+
+@contextmanager
+def open_source(path: Path, source_format: str) -> Iterator[io.TextIOBase]:
+    """Open an import file as text, reaching into Loop's export zip if needed."""
+    if source_format == "loop" and zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            # The wide, all-habits file sits at the top level of the export
+            member = next((name for name in archive.namelist() if name == "Checkmarks.csv"), None)
+            if member is None:
+                raise ValueError("Loop export does not contain Checkmarks.csv")
+            with io.TextIOWrapper(archive.open(member), encoding="utf-8-sig", newline="") as source:
+                yield source
+        return
+
+    with open(path, encoding="utf-8-sig", newline="") as source:
+        yield source
+
+
+def validate_row(fields: dict, today: date) -> ImportRow:
+    """Turn raw parsed fields into an ImportRow, or raise ImportRowError."""
+    if "_error" in fields:
+        raise ImportRowError(fields["_error"])
+
+    name = str(fields.get("habit") or fields.get("habit_name") or fields.get("name") or "").strip()
+    if not name:
+        raise ImportRowError("missing habit name")
+    if len(name) > 50:
+        raise ImportRowError("habit name longer than 50 characters")
+
+    raw_date = str(fields.get("date") or "").strip()
+    try:
+        completion_date = date.fromisoformat(raw_date[:10])
+    except ValueError:
+        raise ImportRowError(f"invalid date {raw_date!r}")
+    if completion_date > today:
+        raise ImportRowError(f"date {completion_date} is in the future")
+
+    freeze = fields.get("freeze", fields.get("used_freeze", False))
+    if isinstance(freeze, str):
+        freeze = freeze.strip().lower() in TRUE_VALUES
+
+    note = fields.get("note")
+    note = str(note)[:500] if note else None
+
+    return ImportRow(habit_name=name, date=completion_date, used_freeze=bool(freeze), note=note)
+
+
+class ImportService:
+    """Streams, validates and bulk-loads completion history for one user."""
+
+    async def _resolve_habits(self, db: AsyncSession, user: User) -> Dict[str, Habit]:
+        result = await db.execute(
+            select(Habit).where(Habit.user_id == user.id, Habit.is_archived.is_(False))
+        )
+        return {habit.name.lower(): habit for habit in result.scalars().all()}
+
+    async def _copy_batch(self, raw_connection, batch: List[tuple]) -> None:
+        await raw_connection.copy_records_to_table(STAGING_TABLE, records=batch, columns=STAGING_COLUMNS)
+
+    async def import_rows(
+        self,
+        db: AsyncSession,
+        user: User,
+        rows: Iterable[Tuple[int, dict]],
+        today: Optional[date] = None,
+        batch_size: Optional[int] = None,
+    ) -> ImportResult:
+        """
+        Import parsed rows for a user inside the caller's transaction.
+
+        Unknown habit names create new habits, subject to the free tier
+        habit limit. Existing completions are never overwritten.
+        """
+        started = time.perf_counter()
+        today = today or date.today()
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        result = ImportResult()
+
+        habits = await self._resolve_habits(db, user)
+        await archive_service.restore_habits(
+            db, [habit.id for habit in habits.values() if habit.history_archived_at is not None]
+        )
+        habit_limit = None if user.is_active_premium else settings.FREE_TIER_MAX_HABITS
+        affected: set = set()
+
+        connection = await db.connection()
+        raw_connection = (await connection.get_raw_connection()).driver_connection
+        await db.execute(text(
+            f"CREATE TEMP TABLE {STAGING_TABLE} "
+            "(habit_id uuid NOT NULL, date date NOT NULL, used_freeze boolean NOT NULL, note varchar(500))"
+        ))
+
+        batch: List[tuple] = []
+        for line_number, fields in rows:
+            result.rows_read += 1
+            try:
+                row = validate_row(fields, today)
+                habit = habits.get(row.habit_name.lower())
+                if habit is None:
+                    if habit_limit is not None and len(habits) >= habit_limit:
+                        raise ImportRowError(f"habit limit reached, skipping {row.habit_name!r}")
+                    habit = Habit(user_id=user.id, name=row.habit_name)
+                    db.add(habit)
+                    await db.flush()
+                    habits[row.habit_name.lower()] = habit
+                    result.habits_created += 1
+            except ImportRowError as exc:
+                result.rows_invalid += 1
+                if len(result.errors) < settings.IMPORT_MAX_ERRORS:
+                    result.errors.append(f"line {line_number}: {exc}")
+                continue
+
+            affected.add(habit.id)
+            batch.append((habit.id, row.date, row.used_freeze, row.note))
+            if len(batch) >= batch_size:
+                await self._copy_batch(raw_connection, batch)
+                result.rows_staged += len(batch)
+                batch = []
+
+        if batch:
+            await self._copy_batch(raw_connection, batch)
+            result.rows_staged += len(batch)
+
+        if affected:
+            merged = await db.execute(MERGE_SQL)
+            result.completions_created = merged.rowcount
+            await streak_service.recalculate_streaks(db, affected, today)
+        await db.execute(text(f"DROP TABLE {STAGING_TABLE}"))
+
+        # Counters changed underneath the session's identity map
+        for habit in habits.values():
+            if habit.id in affected:
+                await db.refresh(habit)
+
+        result.habits_affected = len(affected)
+        result.elapsed_seconds = time.perf_counter() - started
+        return result
+
+    async def import_file(
+        self,
+        db: AsyncSession,
+        user: User,
+        path: Path,
+        source_format: str,
+        today: Optional[date] = None,
+    ) -> ImportResult:
+        """Import a file in one of the supported formats."""
+        if source_format not in PARSERS:
+            raise ValueError(f"Unsupported import format {source_format!r}")
+
+        with open_source(path, source_format) as source:
+            return await self.import_rows(db, user, PARSERS[source_format](source), today)
+
+
+# Global service instance
+import_service = ImportService()
@@ -0,0 +1,365 @@
+"""
+Leaderboard service backed by Redis sorted sets.
+
+Boards are keyed by metric and period:
+    leaderboard:current_streak:global
+    leaderboard:best_streak:global
+    leaderboard:total_completions:global
+    leaderboard:total_completions:weekly:2026-W42
+
+Friend-group boards are the intersection of a global board with the
+group's member set, materialized on read and cached briefly.
+
+Scores are always recomputed from Postgres and written with ZADD, so
+updates are idempotent and must run after the write commits. Users
+updated incrementally are also added to `leaderboard:touched`, so a
+rebuild can re-apply them after swapping in its (older) snapshot. The
+current-streak board only counts habits completed or frozen today or
+yesterday, since `habits.current_streak` isn't reset when a streak lapses.
+"""
+import enum
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from uuid import UUID
+from redis.asyncio import Redis
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.completion import Completion
+from app.models.habit import Habit
+
+WEEKLY_RETENTION = timedelta(weeks=5)
+
+# Users updated incrementally since the last rebuild started
+TOUCHED_KEY = "leaderboard:touched"
+TOUCHED_TTL = timedelta(days=2)
+
+
+class LeaderboardMetric(enum.Enum):
+    """What users are ranked by."""
+    CURRENT_STREAK = "current_streak"   # Longest active streak across habits
+    BEST_STREAK = "best_streak"         # Longest streak ever
+    TOTAL_COMPLETIONS = "total_completions"
+
+
+def week_id(day: date) -> str:
+    """ISO week identifier, e.g. 2026-W42."""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def board_key(metric: LeaderboardMetric, week: Optional[str] = None) -> str:
+    """Sorted set key for a global (week=None) or weekly board."""
+    if week is None:
+        return f"leaderboard:{metric.value}:global"
+    if metric is not LeaderboardMetric.TOTAL_COMPLETIONS:
+        raise ValueError("Weekly leaderboards only exist for total_completions")
+    return f"leaderboard:{metric.value}:weekly:{week}"
+
+
+def weekly_expiry(day: date) -> datetime:
+    """When a weekly board containing `day` can be dropped."""
+    return datetime.combine(day + WEEKLY_RETENTION, datetime.min.time())
+
+
+def group_members_key(group_id: str) -> str:
+    return f"leaderboard:group:{group_id}:members"
+
+
+def live_streak(today: date):
+    """Habit.current_streak if the streak is still alive on `today`, else 0."""
+    recent = select(Completion.habit_id).where(Completion.date >= today - timedelta(days=1))
+    return case((Habit.id.in_(recent), Habit.current_streak), else_=0)
+
+
+class LeaderboardService:
+    """Ranks users by streaks and completions with O(log N) lookups."""
+
+    async def user_scores(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        today: Optional[date] = None,
+    ) -> Dict[LeaderboardMetric, int]:
+        """Current global scores for one user, from their active habits."""
+        result = await db.execute(
+            select(
+                func.coalesce(func.max(live_streak(today or date.today())), 0),
+                func.coalesce(func.max(Habit.best_streak), 0),
+                func.coalesce(func.sum(Habit.total_completions), 0),
+            ).where(Habit.user_id == user_id, Habit.is_archived.is_(False))
+        )
+        current, best, total = result.one()
+        return {
+            LeaderboardMetric.CURRENT_STREAK: current,
+            LeaderboardMetric.BEST_STREAK: best,
+            LeaderboardMetric.TOTAL_COMPLETIONS: int(total),
+        }
+
+    async def refresh_user(
+        self,
+        db: AsyncSession,
+        redis: Redis,
+        user_id: UUID,
+        today: Optional[date] = None,
+    ) -> None:
+        """
+        Reset a user's global scores and this week's count from Postgres,
+        e.g. after a bulk import.
+        """
+        today = today or date.today()
+        scores = await self.user_scores(db, user_id, today)
+        week_start = today - timedelta(days=today.weekday())
+        weekly_count = (await self.weekly_counts(db, [user_id], week_start)).get(str(user_id), 0)
+        weekly = board_key(LeaderboardMetric.TOTAL_COMPLETIONS, week_id(today))
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for metric, score in scores.items():
+                pipe.zadd(board_key(metric), {str(user_id): score})
+            pipe.zadd(weekly, {str(user_id): weekly_count})
+            pipe.expireat(weekly, weekly_expiry(today))
+            pipe.sadd(TOUCHED_KEY, str(user_id))
+            pipe.expire(TOUCHED_KEY, TOUCHED_TTL)
+            await pipe.execute()
+
+    async def record_completion(
+        self,
+        db: AsyncSession,
+        redis: Redis,
+        user_id: UUID,
+        completion_date: date,
+        today: Optional[date] = None,
+    ) -> None:
+        """Update every board a committed completion affects."""
+        await self.record_completions(db, redis, [(user_id, completion_date)], today)
+
+    async def weekly_counts(
+        self,
+        db: AsyncSession,
+        user_ids: Iterable[UUID],
+        week_start: date,
+    ) -> Dict[str, int]:
+        """Completions (freezes excluded) per user in the week starting `week_start`."""
+        result = await db.execute(
+            select(Habit.user_id, func.count(Completion.id))
+            .join(Completion, Completion.habit_id == Habit.id)
+            .where(
+                Habit.user_id.in_(set(user_ids)),
+                Habit.is_archived.is_(False),
+                Completion.date >= week_start,
+                Completion.date < week_start + timedelta(days=7),
+                Completion.used_freeze.is_(False),
+            )
+            .group_by(Habit.user_id)
+        )
+        return {str(user_id): count for user_id, count in result.all()}
+
+    async def record_completions(
+        self,
+        db: AsyncSession,
+        redis: Redis,
+        completions: Iterable[Tuple[UUID, date]],
+        today: Optional[date] = None,
+    ) -> None:
+        """
+        Update the boards for a batch of committed (user_id, date) completions.
+
+        Global scores come from one grouped query, weekly counts from one
+        query per week touched, and every board write goes out in a single
+        pipeline. Safe to repeat: nothing is incremented.
+        """
+        completions = list(completions)
+        if not completions:
+            return
+        today = today or date.today()
+
+        user_ids = {user_id for user_id, _ in completions}
+        weeks: Dict[date, set] = {}
+        for user_id, completion_date in completions:
+            weeks.setdefault(completion_date - timedelta(days=completion_date.weekday()), set()).add(user_id)
+        weekly = {
+            week_start: (members, await self.weekly_counts(db, members, week_start))
+            for week_start, members in weeks.items()
+        }
+
+        result = await db.execute(
+            select(
+                Habit.user_id,
+                func.max(live_streak(today)),
+                func.max(Habit.best_streak),
+                func.sum(Habit.total_completions),
+            )
+            .where(Habit.user_id.in_(user_ids), Habit.is_archived.is_(False))
+            .group_by(Habit.user_id)
+        )
+        scores = {
+            LeaderboardMetric.CURRENT_STREAK: {},
+            LeaderboardMetric.BEST_STREAK: {},
+            LeaderboardMetric.TOTAL_COMPLETIONS: {},
+        }
+        for user_id, current, best, total in result.all():
+            scores[LeaderboardMetric.CURRENT_STREAK][str(user_id)] = current
+            scores[LeaderboardMetric.BEST_STREAK][str(user_id)] = best
+            scores[LeaderboardMetric.TOTAL_COMPLETIONS][str(user_id)] = int(total)
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for metric, members in scores.items():
+                if members:
+                    pipe.zadd(board_key(metric), members)
+            for week_start, (members, counts) in weekly.items():
+                key = board_key(LeaderboardMetric.TOTAL_COMPLETIONS, week_id(week_start))
+                pipe.zadd(key, {str(user_id): counts.get(str(user_id), 0) for user_id in members})
+                pipe.expireat(key, weekly_expiry(week_start))
+            pipe.sadd(TOUCHED_KEY, *(str(user_id) for user_id in user_ids))
+            pipe.expire(TOUCHED_KEY, TOUCHED_TTL)
+            await pipe.execute()
+
+    async def set_group_members(self, redis: Redis, group_id: str, user_ids: Iterable[Union[UUID, str]]) -> None:
+        """Replace a friend group's membership."""
+        key = group_members_key(group_id)
+        members = [str(user_id) for user_id in user_ids]
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if members:
+                pipe.sadd(key, *members)
+            await pipe.execute()
+
+    async def _resolve_board(
+        self,
+        redis: Redis,
+        metric: LeaderboardMetric,
+        week: Optional[str],
+        group_id: Optional[str],
+    ) -> str:
+        key = board_key(metric, week)
+        if group_id is None:
+            return key
+
+        group_key = f"{key}:group:{group_id}"
+        if not await redis.exists(group_key):
+            # Set members score 1 in ZINTERSTORE; weight 0 keeps the board score
+            await redis.zinterstore(group_key, {key: 1, group_members_key(group_id): 0})
+            await redis.expire(group_key, settings.LEADERBOARD_GROUP_CACHE_SECONDS)
+        return group_key
+
+    async def get_rank(
+        self,
+        redis: Redis,
+        user_id: Union[UUID, str],
+        metric: LeaderboardMetric,
+        week: Optional[str] = None,
+        group_id: Optional[str] = None,
+    ) -> Optional[dict]:
+        """A user's 1-based rank and score on a board, or None if unranked."""
+        key = await self._resolve_board(redis, metric, week, group_id)
+        member = str(user_id)
+
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zrevrank(key, member)
+            pipe.zscore(key, member)
+            pipe.zcard(key)
+            rank, score, total = await pipe.execute()
+
+        if rank is None:
+            return None
+        return {"user_id": member, "rank": rank + 1, "score": int(score), "total": total}
+
+    async def get_top(
+        self,
+        redis: Redis,
+        metric: LeaderboardMetric,
+        week: Optional[str] = None,
+        group_id: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> List[dict]:
+        """A page of the board, highest score first."""
+        limit = min(limit, settings.LEADERBOARD_MAX_PAGE_SIZE)
+        key = await self._resolve_board(redis, metric, week, group_id)
+        entries = await redis.zrevrange(key, offset, offset + limit - 1, withscores=True)
+        return [
+            {"user_id": member, "rank": offset + index + 1, "score": int(score)}
+            for index, (member, score) in enumerate(entries)
+        ]
+
+    async def rebuild(
+        self,
+        db: AsyncSession,
+        redis: Redis,
+        today: Optional[date] = None,
+        chunk_size: int = 5000,
+    ) -> Dict[str, int]:
+        """
+        Repopulate the global and current-week boards from Postgres.
+
+        Boards are built under temporary keys and swapped in with RENAME,
+        so readers never see a half-built board. Users updated
+        incrementally while it ran are re-applied from Postgres after the
+        swap, so their newer scores aren't lost to the snapshot.
+        """
+        today = today or date.today()
+        week_start = today - timedelta(days=today.weekday())
+        weekly = board_key(LeaderboardMetric.TOTAL_COMPLETIONS, week_id(today))
+        targets = {metric: board_key(metric) for metric in LeaderboardMetric}
+        columns = {
+            LeaderboardMetric.CURRENT_STREAK: 1,
+            LeaderboardMetric.BEST_STREAK: 2,
+            LeaderboardMetric.TOTAL_COMPLETIONS: 3,
+        }
+
+        await redis.delete(TOUCHED_KEY, *(f"{key}:rebuild" for key in [*targets.values(), weekly]))
+
+        totals = await db.stream(
+            select(
+                Habit.user_id,
+                func.max(live_streak(today)),
+                func.max(Habit.best_streak),
+                func.sum(Habit.total_completions),
+            )
+            .where(Habit.is_archived.is_(False))
+            .group_by(Habit.user_id)
+        )
+        counts = dict.fromkeys(targets.values(), 0)
+        async for rows in totals.partitions(chunk_size):
+            async with redis.pipeline(transaction=False) as pipe:
+                for metric, column in columns.items():
+                    pipe.zadd(f"{targets[metric]}:rebuild", {str(row[0]): int(row[column]) for row in rows})
+                await pipe.execute()
+            for key in targets.values():
+                counts[key] += len(rows)
+
+        weekly_rows = await db.stream(
+            select(Habit.user_id, func.count(Completion.id))
+            .join(Completion, Completion.habit_id == Habit.id)
+            .where(
+                Habit.is_archived.is_(False),
+                Completion.date >= week_start,
+                Completion.used_freeze.is_(False),
+            )
+            .group_by(Habit.user_id)
+        )
+        counts[weekly] = 0
+        async for rows in weekly_rows.partitions(chunk_size):
+            await redis.zadd(f"{weekly}:rebuild", {str(user_id): count for user_id, count in rows})
+            counts[weekly] += len(rows)
+
+        async with redis.pipeline(transaction=True) as pipe:
+            for key, count in counts.items():
+                if count:
+                    pipe.rename(f"{key}:rebuild", key)
+                else:
+                    pipe.delete(key)
+            pipe.expireat(weekly, weekly_expiry(week_start))
+            pipe.smembers(TOUCHED_KEY)
+            pipe.delete(TOUCHED_KEY)
+            touched = list((await pipe.execute())[-2])
+
+        for start in range(0, len(touched), chunk_size):
+            await self.record_completions(
+                db, redis, [(UUID(user_id), today) for user_id in touched[start:start + chunk_size]], today
+            )
+        return counts
+
+
+# Global service instance
+leaderboard_service = LeaderboardService()
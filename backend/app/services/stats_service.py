@@ -0,0 +1,203 @@
+"""
+User statistics service with a debounced, batched Redis cache.
+
+Writes mark users dirty in a Redis set; a periodic task pops a batch of
+dirty users, computes their stats with grouped queries and writes every
+result back in a single pipelined MSET.
+"""
+import json
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Union
+from uuid import UUID
+from redis.asyncio import Redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.achievement import Achievement
+from app.models.completion import Completion
+from app.models.habit import Habit
+
+DIRTY_USERS_KEY = "stats:dirty_users"
+
+
+def stats_cache_key(user_id: Union[UUID, str]) -> str:
+    """Redis key holding a user's cached stats JSON."""
+    return f"stats:user:{user_id}"
+
+
+class StatsService:
+    """Per-user statistics, computed in batches and cached in Redis."""
+
+    async def mark_user_dirty(self, redis: Redis, user_id: Union[UUID, str]) -> None:
+        """Queue a user for the next stats batch. Repeated marks collapse into one."""
+        await redis.sadd(DIRTY_USERS_KEY, str(user_id))
+
+    async def mark_users_dirty(self, redis: Redis, user_ids: Iterable[Union[UUID, str]]) -> None:
+        """Queue several users at once."""
+        members = {str(user_id) for user_id in user_ids}
+        if members:
+            await redis.sadd(DIRTY_USERS_KEY, *members)
+
+    async def get_cached_stats(self, redis: Redis, user_id: Union[UUID, str]) -> Optional[dict]:
+        """Read a user's cached stats, if any."""
+        cached = await redis.get(stats_cache_key(user_id))
+        return json.loads(cached) if cached else None
+
+    async def compute_user_stats(
+        self,
+        db: AsyncSession,
+        user_ids: Iterable[UUID],
+        today: Optional[date] = None,
+    ) -> Dict[str, dict]:
+        """
+        Compute stats for many users at once.
+
+        Each aggregate is a single GROUP BY user_id query over the whole
+        batch, so the query count is constant regardless of batch size.
+        """
+        user_ids = list(user_ids)
+        today = today or date.today()
+        week_start = today - timedelta(days=6)
+        month_start = today - timedelta(days=29)
+        active = (Habit.user_id.in_(user_ids), Habit.is_archived.is_(False))
+
+        stats: Dict[str, dict] = {
+            str(user_id): {
+                "user_id": str(user_id),
+                "active_habits": 0,
+                "total_completions": 0,
+                "total_freezes_used": 0,
+                "best_streak": 0,
+                "longest_current_streak": 0,
+                "completions_7d": 0,
+                "completions_30d": 0,
+                "completion_rate_30d": 0.0,
+                "achievements_unlocked": 0,
+                "best_habit": None,
+                "worst_habit": None,
+                "calculated_at": datetime.utcnow().isoformat(),
+            }
+            for user_id in user_ids
+        }
+
+        totals = await db.execute(
+            select(
+                Habit.user_id,
+                func.count(Habit.id),
+                func.coalesce(func.sum(Habit.total_completions), 0),
+                func.coalesce(func.sum(Habit.total_freezes_used), 0),
+                func.coalesce(func.max(Habit.best_streak), 0),
+                func.coalesce(func.max(Habit.current_streak), 0),
+            )
+            .where(*active)
+            .group_by(Habit.user_id)
+        )
+        for user_id, habits, completions, freezes, best, longest in totals.all():
+            stats[str(user_id)].update({
+                "active_habits": habits,
+                "total_completions": int(completions),
+                "total_freezes_used": int(freezes),
+                "best_streak": best,
+                "longest_current_streak": longest,
+            })
+
+        recent = await db.execute(
+            select(
+                Habit.user_id,
+                func.count(Completion.id).filter(Completion.date >= week_start),
+                func.count(Completion.id),
+            )
+            .join(Completion, Completion.habit_id == Habit.id)
+            .where(*active, Completion.date >= month_start, Completion.used_freeze.is_(False))
+            .group_by(Habit.user_id)
+        )
+        for user_id, week, month in recent.all():
+            entry = stats[str(user_id)]
+            entry["completions_7d"] = week
+            entry["completions_30d"] = month
+            if entry["active_habits"]:
+                entry["completion_rate_30d"] = round(month / (entry["active_habits"] * 30) * 100, 2)
+
+        achievements = await db.execute(
+            select(Achievement.user_id, func.count(Achievement.id))
+            .where(Achievement.user_id.in_(user_ids))
+            .group_by(Achievement.user_id)
+        )
+        for user_id, count in achievements.all():
+            stats[str(user_id)]["achievements_unlocked"] = count
+
+        habits = await db.execute(
+            select(Habit.user_id, Habit.id, Habit.name, Habit.current_streak, Habit.total_completions, Habit.created_at)
+            .where(*active)
+        )
+        ranked: Dict[str, List[dict]] = {}
+        now = datetime.utcnow()
+        for user_id, habit_id, name, current_streak, total_completions, created_at in habits.all():
+            days = (now - created_at).days + 1
+            ranked.setdefault(str(user_id), []).append({
+                "id": str(habit_id),
+                "name": name,
+                "current_streak": current_streak,
+                "completion_rate": round(min(100.0, total_completions / days * 100), 2),
+            })
+        for user_id, user_habits in ranked.items():
+            user_habits.sort(key=lambda habit: (habit["completion_rate"], habit["current_streak"]))
+            stats[user_id]["best_habit"] = user_habits[-1]
+            stats[user_id]["worst_habit"] = user_habits[0]
+
+        return stats
+
+    async def write_user_stats(
+        self,
+        redis: Redis,
+        stats: Dict[str, dict],
+        ttl: Optional[int] = None,
+    ) -> None:
+        """Write all users' stats in one round trip (MSET plus per-key TTLs)."""
+        if not stats:
+            return
+
+        ttl = ttl or settings.STATS_CACHE_TTL_SECONDS
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.mset({stats_cache_key(user_id): json.dumps(entry) for user_id, entry in stats.items()})
+            for user_id in stats:
+                pipe.expire(stats_cache_key(user_id), ttl)
+            await pipe.execute()
+
+    async def process_dirty_users(
+        self,
+        db: AsyncSession,
+        redis: Redis,
+        batch_size: Optional[int] = None,
+    ) -> dict:
+        """
+        Pop up to `batch_size` dirty users, compute and cache their stats.
+
+        Users are put back in the dirty set if the batch fails, so nothing
+        is lost when the database or Redis hiccups.
+        """
+        batch_size = batch_size or settings.STATS_BATCH_SIZE
+        started = time.perf_counter()
+
+        user_ids = await redis.spop(DIRTY_USERS_KEY, batch_size)
+        if not user_ids:
+            return {"processed": 0, "elapsed_seconds": 0.0, "users_per_second": 0.0}
+
+        try:
+            stats = await self.compute_user_stats(db, [UUID(user_id) for user_id in user_ids])
+            await self.write_user_stats(redis, stats)
+        except Exception:
+            await redis.sadd(DIRTY_USERS_KEY, *user_ids)
+            raise
+
+        elapsed = time.perf_counter() - started
+        return {
+            "processed": len(user_ids),
+            "elapsed_seconds": round(elapsed, 4),
+            "users_per_second": round(len(user_ids) / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+# Global service instance
+stats_service = StatsService()
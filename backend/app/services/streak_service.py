@@ -0,0 +1,158 @@
+"""
+Streak calculation service.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.completion import Completion
+from app.models.habit import Habit
+
+# (date, used_freeze) pairs as loaded from the completions table
+CompletionDays = Iterable[Tuple[date, bool]]
+
+# Streaks are islands of consecutive dates (date - row_number is constant
+# within one); freeze days extend an island without adding to its length.
+RECOMPUTE_SQL = text("""
+    WITH days AS (
+        SELECT habit_id, date, used_freeze,
+               date - (ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY date))::int AS island
+        FROM completions
+        WHERE habit_id = ANY(:habit_ids)
+    ),
+    runs AS (
+        SELECT habit_id, MAX(date) AS end_date,
+               COUNT(*) FILTER (WHERE NOT used_freeze) AS length
+        FROM days
+        GROUP BY habit_id, island
+    ),
+    streaks AS (
+        SELECT habit_id,
+               MAX(length) AS best_streak,
+               COALESCE(MAX(length) FILTER (WHERE end_date >= :yesterday), 0) AS current_streak
+        FROM runs
+        GROUP BY habit_id
+    ),
+    totals AS (
+        SELECT habit_id,
+               MIN(date) AS first_date,
+               MAX(date) FILTER (WHERE NOT used_freeze) AS last_date,
+               COUNT(*) FILTER (WHERE NOT used_freeze) AS total_completions,
+               COUNT(*) FILTER (WHERE used_freeze) AS total_freezes_used
+        FROM completions
+        WHERE habit_id = ANY(:habit_ids)
+        GROUP BY habit_id
+    )
+    UPDATE habits AS h SET
+        current_streak = s.current_streak,
+        best_streak = GREATEST(h.best_streak, s.best_streak),
+        total_completions = t.total_completions,
+        total_freezes_used = t.total_freezes_used,
+        last_completed_at = GREATEST(h.last_completed_at, t.last_date::timestamp),
+        created_at = LEAST(h.created_at, t.first_date::timestamp),
+        updated_at = now() at time zone 'utc'
+    FROM streaks AS s JOIN totals AS t USING (habit_id)
+    WHERE h.id = s.habit_id
+""")
+
+
+class StreakService:
+    """
+    Streak calculation for habits.
+
+    Freeze days keep a streak alive but don't add to it. A habit that
+    hasn't been completed yet today still counts yesterday's streak.
+    """
+
+    def calculate_current_streak(
+        self,
+        completions: CompletionDays,
+        today: Optional[date] = None,
+    ) -> int:
+        """Calculate the current streak ending today (or yesterday)."""
+        days: Dict[date, bool] = dict(completions)
+        current_date = today or date.today()
+
+        if current_date not in days:
+            current_date -= timedelta(days=1)
+
+        streak = 0
+        one_day = timedelta(days=1)
+        while current_date in days:
+            if not days[current_date]:
+                streak += 1
+            current_date -= one_day
+
+        return streak
+
+    def calculate_best_streak(self, completions: CompletionDays) -> int:
+        """Calculate the longest streak across the full completion history."""
+        days = sorted(dict(completions).items())
+
+        best = 0
+        streak = 0
+        previous: Optional[date] = None
+        for day, used_freeze in days:
+            if previous is None or (day - previous).days != 1:
+                streak = 0
+            if not used_freeze:
+                streak += 1
+                if streak > best:
+                    best = streak
+            previous = day
+
+        return best
+
+    async def get_completion_days(self, db: AsyncSession, habit_id: UUID) -> list:
+        """Load (date, used_freeze) pairs for a habit."""
+        result = await db.execute(
+            select(Completion.date, Completion.used_freeze).where(Completion.habit_id == habit_id)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def recalculate_streaks(
+        self,
+        db: AsyncSession,
+        habit_ids: Iterable[UUID],
+        today: Optional[date] = None,
+    ) -> None:
+        """
+        Recalculate streaks and counters for many habits in one UPDATE.
+
+        Same rules as calculate_current_streak/calculate_best_streak, but
+        computed in Postgres for bulk writes (imports, buffered check-ins).
+        Loaded Habit instances are stale afterwards; refresh them if needed.
+
+        The habits are locked first, in id order and in their own statement,
+        so when two writers recompute the same habit the second one's
+        UPDATE reads the completions the first one committed.
+        """
+        today = today or date.today()
+        habit_ids = sorted(set(habit_ids))
+        await db.execute(select(Habit.id).where(Habit.id.in_(habit_ids)).order_by(Habit.id).with_for_update())
+        await db.execute(
+            RECOMPUTE_SQL,
+            {"habit_ids": habit_ids, "yesterday": today - timedelta(days=1)},
+        )
+
+    async def recalculate_streak(
+        self,
+        db: AsyncSession,
+        habit: Habit,
+        today: Optional[date] = None,
+    ) -> Habit:
+        """Recalculate and update a habit's streak values."""
+        days = await self.get_completion_days(db, habit.id)
+
+        habit.current_streak = self.calculate_current_streak(days, today)
+        habit.best_streak = max(
+            habit.best_streak or 0,
+            habit.current_streak,
+            self.calculate_best_streak(days),
+        )
+        return habit
+
+
+# Global service instance
+streak_service = StreakService()
@@ -33,8 +33,20 @@ celery_app.conf.beat_schedule = {
         "task": "app.worker.tasks.check_streak_freezes",
         "schedule": crontab(hour=0, minute=5),  # Run daily at 00:05 UTC
     },
+    "rebuild-leaderboards": {
+        "task": "app.worker.tasks.rebuild_leaderboards",
+        "schedule": crontab(hour=0, minute=15),  # Drops streaks that lapsed yesterday
+    },
+    "archive-cold-history": {
+        "task": "app.worker.tasks.archive_cold_history",
+        "schedule": crontab(hour=3, minute=30),  # Off-peak
+    },
     "send-reminder-notifications": {
         "task": "app.worker.tasks.send_reminder_notifications",
         "schedule": crontab(hour="*/4"),  # Run every 4 hours
     },
+    "process-dirty-user-stats": {
+        "task": "app.worker.tasks.process_dirty_user_stats",
+        "schedule": settings.STATS_BATCH_INTERVAL_SECONDS,
+    },
 }
@@ -0,0 +1,141 @@
+"""
+Flusher for the write-behind check-in buffer.
+
+Run one or more alongside the API when CHECKIN_WRITE_BEHIND is enabled:
+
+    python -m app.worker.checkin_flusher [--consumer NAME]
+
+Each pass writes whatever has accumulated in the stream (up to
+CHECKIN_FLUSH_BATCH_SIZE) in one transaction, then waits out the rest of
+CHECKIN_FLUSH_INTERVAL_MS, so a burst of check-ins costs a handful of
+transactions instead of one each. Flushers share the consumer group, so
+adding more spreads the stream between them.
+
+If a batch fails, its check-ins are retried one transaction each so a
+single bad entry can't hold back the rest; entries that still fail stay
+pending and are dead-lettered after CHECKIN_MAX_DELIVERIES attempts.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+from typing import List, Optional
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.cache import create_redis_client
+from app.config import settings
+from app.database import create_engine, create_sessionmaker
+from app.services.checkin_buffer import BufferedCheckin, checkin_buffer
+from app.services.completion_service import completion_service
+from app.services.leaderboard_service import leaderboard_service
+from app.services.stats_service import stats_service
+
+logger = logging.getLogger(__name__)
+
+
+async def write_checkins(
+    sessionmaker: async_sessionmaker,
+    redis: Redis,
+    checkins: List[BufferedCheckin],
+) -> List[BufferedCheckin]:
+    """Write check-ins in one transaction and acknowledge them. Returns the new ones."""
+    async with sessionmaker() as db:
+        inserted = await completion_service.log_buffered_completions(db, checkins)
+        await db.commit()
+
+        # Only acknowledged once committed; a crash before this replays the batch
+        await checkin_buffer.acknowledge(redis, checkins)
+
+        if inserted:
+            await stats_service.mark_users_dirty(redis, (checkin.user_id for checkin in inserted))
+            await leaderboard_service.record_completions(
+                db, redis, [(checkin.user_id, checkin.date) for checkin in inserted]
+            )
+    return inserted
+
+
+async def flush_once(
+    sessionmaker: async_sessionmaker,
+    redis: Redis,
+    consumer: str,
+    block_ms: Optional[int] = None,
+) -> int:
+    """Read one batch from the buffer and write it. Returns the batch size."""
+    checkins = await checkin_buffer.read(redis, consumer, block_ms=block_ms)
+    if not checkins:
+        return 0
+
+    try:
+        inserted = await write_checkins(sessionmaker, redis, checkins)
+    except Exception:
+        if len(checkins) == 1:
+            raise
+        logger.exception("Check-in batch of %d failed, retrying one at a time", len(checkins))
+        inserted = []
+        for checkin in checkins:
+            try:
+                inserted.extend(await write_checkins(sessionmaker, redis, [checkin]))
+            except Exception:
+                # Left pending: claimed again later, dead-lettered after CHECKIN_MAX_DELIVERIES
+                logger.exception("Check-in %s failed", checkin.entry_id)
+
+    logger.info("Flushed %d check-ins (%d new completions)", len(checkins), len(inserted))
+    return len(checkins)
+
+
+async def run(consumer: str, stop: Optional[asyncio.Event] = None) -> None:
+    """Flush the buffer every CHECKIN_FLUSH_INTERVAL_MS until `stop` is set."""
+    stop = stop or asyncio.Event()
+    interval = settings.CHECKIN_FLUSH_INTERVAL_MS / 1000
+    loop = asyncio.get_running_loop()
+
+    # One connection is all a single flusher needs
+    engine = create_engine(pool_size=1, max_overflow=1)
+    sessionmaker = create_sessionmaker(engine)
+    redis = create_redis_client()
+    await checkin_buffer.ensure_group(redis)
+    logger.info("Check-in flusher %s started", consumer)
+
+    try:
+        while not stop.is_set():
+            started = loop.time()
+            try:
+                flushed = await flush_once(
+                    sessionmaker, redis, consumer, block_ms=settings.CHECKIN_FLUSH_INTERVAL_MS
+                )
+            except Exception:
+                # The batch stays pending in the group and is claimed again later
+                logger.exception("Check-in flush failed")
+                flushed = 0
+
+            if flushed < settings.CHECKIN_FLUSH_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(stop.wait(), max(0.0, interval - (loop.time() - started)))
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        await redis.aclose()
+        await engine.dispose()
+        logger.info("Check-in flusher %s stopped", consumer)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    async def serve() -> None:
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        await run(args.consumer, stop)
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
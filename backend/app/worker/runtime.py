@@ -0,0 +1,118 @@
+"""
+Persistent async runtime for Celery worker processes.
+
+Each worker process owns one event loop, one async engine pool and one
+Redis client, created in `worker_process_init` and reused by every task
+that process runs. Tasks call `run_async()` instead of `asyncio.run()`,
+so they no longer pay for a new loop and fresh DB connections each time.
+"""
+import asyncio
+from typing import Awaitable, Callable, Iterable, List, Optional, TypeVar
+from celery.signals import worker_process_init, worker_process_shutdown
+from celery.utils.log import get_task_logger
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from app.cache import create_redis_client
+from app.config import settings
+from app.database import create_engine, create_sessionmaker
+
+logger = get_task_logger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    """Event loop plus the async clients bound to it."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.engine: AsyncEngine = create_engine(
+            pool_size=settings.WORKER_DB_POOL_SIZE,
+            max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+        )
+        self.sessionmaker: async_sessionmaker = create_sessionmaker(self.engine)
+        self.redis: Redis = create_redis_client()
+
+    def run(self, coro: Awaitable[T]) -> T:
+        return self.loop.run_until_complete(coro)
+
+    def close(self) -> None:
+        try:
+            self.run(self.redis.aclose())
+            self.run(self.engine.dispose())
+        finally:
+            self.loop.close()
+
+
+_runtime: Optional[WorkerRuntime] = None
+
+
+def get_runtime() -> WorkerRuntime:
+    """
+    Get this process's runtime, creating it on first use.
+
+    Prefork children get theirs from `worker_process_init`; lazy creation
+    covers the solo pool, eager tasks and scripts.
+    """
+    global _runtime
+    if _runtime is None:
+        _runtime = WorkerRuntime()
+    return _runtime
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion on the worker's persistent loop."""
+    return get_runtime().run(coro)
+
+
+def session() -> AsyncSession:
+    """New session from the worker's engine pool."""
+    return get_runtime().sessionmaker()
+
+
+def redis() -> Redis:
+    """The worker's Redis client."""
+    return get_runtime().redis
+
+
+async def gather_bounded(
+    factories: Iterable[Callable[[], Awaitable[T]]],
+    limit: Optional[int] = None,
+) -> List[T]:
+    """
+    Run coroutine factories concurrently, at most `limit` at a time.
+
+    Keep `limit` at or below the worker pool size so concurrent DB work
+    doesn't queue on connection checkout. If one fails, the rest are
+    cancelled and awaited before the first error is raised, so nothing is
+    left scheduled on the persistent loop for the next task to trip over.
+    """
+    semaphore = asyncio.Semaphore(limit or settings.WORKER_ASYNC_CONCURRENCY)
+
+    async def bounded(factory: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await factory()
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(bounded(factory)) for factory in factories]
+    except ExceptionGroup as exc:
+        raise exc.exceptions[0]
+    return [task.result() for task in tasks]
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Create the per-process loop, engine and Redis client."""
+    global _runtime
+    _runtime = WorkerRuntime()
+    logger.info("Worker async runtime initialized")
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Release pooled connections before the child exits."""
+    global _runtime
+    if _runtime is not None:
+        _runtime.close()
+        _runtime = None
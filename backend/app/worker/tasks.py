@@ -1,8 +1,19 @@
 """
 Background tasks for habit tracking, notifications, and analytics.
 """
+import time
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
 from celery import shared_task
 from celery.utils.log import get_task_logger
+from app.config import settings
+from app.models.user import User
+from app.services.archive_service import archive_service
+from app.services.import_service import import_service
+from app.services.leaderboard_service import leaderboard_service
+from app.services.stats_service import stats_service
+from app.worker import runtime
 
 logger = get_task_logger(__name__)
 
@@ -37,19 +48,181 @@ def send_reminder_notifications():
     return {"status": "completed", "notifications_sent": 0}
 
 
+async def _calculate_user_stats(user_id: str) -> None:
+    async with runtime.session() as db:
+        stats = await stats_service.compute_user_stats(db, [UUID(user_id)])
+    await stats_service.write_user_stats(runtime.redis(), stats)
+
+
+async def _process_dirty_user_stats(batch_size: Optional[int], batches: int, budget_seconds: float) -> dict:
+    batch_size = batch_size or settings.STATS_BATCH_SIZE
+
+    async def process_batch() -> dict:
+        async with runtime.session() as db:
+            return await stats_service.process_dirty_users(db, runtime.redis(), batch_size)
+
+    processed = rounds = 0
+    started = time.perf_counter()
+    while True:
+        results = await runtime.gather_bounded(process_batch for _ in range(batches))
+        processed += sum(result["processed"] for result in results)
+        rounds += 1
+        # A short batch means the dirty set is drained; otherwise keep going until the next run is due
+        if any(result["processed"] < batch_size for result in results):
+            break
+        if time.perf_counter() - started >= budget_seconds:
+            break
+    elapsed = time.perf_counter() - started
+
+    return {
+        "processed": processed,
+        "rounds": rounds,
+        "elapsed_seconds": round(elapsed, 4),
+        "users_per_second": round(processed / elapsed, 1) if elapsed else 0.0,
+    }
+
+
 @shared_task(name="app.worker.tasks.calculate_user_stats")
 def calculate_user_stats(user_id: str):
     """
     Calculate and cache user statistics.
-    
+
+    Prefer marking the user dirty (see process_dirty_user_stats) from
+    write paths; this task is for on-demand, single-user refreshes.
+
     Args:
         user_id: The user ID to calculate stats for
     """
     logger.info(f"Calculating stats for user {user_id}...")
-    # TODO: Implement stats calculation
-    # 1. Calculate completion rates
-    # 2. Identify best/worst performing habits
-    # 3. Calculate streaks and achievements
-    # 4. Cache results in Redis
+    runtime.run_async(_calculate_user_stats(user_id))
     logger.info(f"Stats calculation completed for user {user_id}")
     return {"status": "completed", "user_id": user_id}
+
+
+@shared_task(name="app.worker.tasks.process_dirty_user_stats")
+def process_dirty_user_stats(batch_size: Optional[int] = None, batches: Optional[int] = None):
+    """
+    Compute and cache stats for batches of users marked dirty by writes.
+    Runs every STATS_BATCH_INTERVAL_SECONDS, and keeps draining in rounds
+    while batches come back full, for up to one interval, so a burst of
+    check-ins doesn't outgrow the dirty set.
+
+    Args:
+        batch_size: Max users per batch (defaults to STATS_BATCH_SIZE)
+        batches: Batches per round, each on its own session (defaults to STATS_CONCURRENT_BATCHES)
+    """
+    result = runtime.run_async(_process_dirty_user_stats(
+        batch_size,
+        batches or settings.STATS_CONCURRENT_BATCHES,
+        settings.STATS_BATCH_INTERVAL_SECONDS,
+    ))
+    if result["processed"]:
+        logger.info(
+            f"Processed stats for {result['processed']} users "
+            f"({result['users_per_second']} users/s)"
+        )
+    return {"status": "completed", **result}
+
+
+async def _rebuild_leaderboards() -> dict:
+    async with runtime.session() as db:
+        return await leaderboard_service.rebuild(db, runtime.redis())
+
+
+@shared_task(name="app.worker.tasks.rebuild_leaderboards")
+def rebuild_leaderboards():
+    """
+    Repopulate all leaderboards from Postgres.
+    Runs nightly, just after midnight UTC, so users whose streaks lapsed
+    yesterday without a check-in drop off the current-streak board.
+    """
+    logger.info("Rebuilding leaderboards...")
+    counts = runtime.run_async(_rebuild_leaderboards())
+    logger.info(f"Leaderboards rebuilt: {counts}")
+    return {"status": "completed", "boards": counts}
+
+
+async def _import_habit_history(user_id: str, path: str, source_format: str) -> dict:
+    async with runtime.session() as db:
+        user = await db.get(User, UUID(user_id))
+        if user is None:
+            raise ValueError(f"User {user_id} not found")
+
+        result = await import_service.import_file(db, user, Path(path), source_format)
+        await db.commit()
+
+        await stats_service.mark_user_dirty(runtime.redis(), user.id)
+        await leaderboard_service.refresh_user(db, runtime.redis(), user.id)
+    return result.to_dict()
+
+
+@shared_task(name="app.worker.tasks.import_habit_history")
+def import_habit_history(user_id: str, path: str, source_format: str):
+    """
+    Import completion history exported from another tracker.
+
+    Args:
+        user_id: The user to import for
+        path: Uploaded export file, readable by the worker
+        source_format: One of "loop", "csv", "json"
+    """
+    logger.info(f"Importing {source_format} history for user {user_id} from {path}...")
+    result = runtime.run_async(_import_habit_history(user_id, path, source_format))
+    logger.info(
+        f"Import for user {user_id} completed: {result['completions_created']} completions, "
+        f"{result['rows_invalid']} invalid rows in {result['elapsed_seconds']}s"
+    )
+    return {"status": "completed", "user_id": user_id, **result}
+
+
+async def _archive_cold_history(batch_size: Optional[int], max_batches: int) -> dict:
+    async with runtime.session() as db:
+        before = await archive_service.table_sizes(db)
+
+        habits = completions = batches = 0
+        started = time.perf_counter()
+        while batches < max_batches:
+            result = await archive_service.archive_batch(db, batch_size)
+            await db.commit()
+            if not result["habits"]:
+                break
+            habits += result["habits"]
+            completions += result["completions"]
+            batches += 1
+        elapsed = time.perf_counter() - started
+
+        after = await archive_service.table_sizes(db)
+    return {
+        "habits": habits,
+        "completions": completions,
+        "batches": batches,
+        "elapsed_seconds": round(elapsed, 3),
+        "sizes_before": before,
+        "sizes_after": after,
+    }
+
+
+@shared_task(name="app.worker.tasks.archive_cold_history")
+def archive_cold_history(batch_size: Optional[int] = None, max_batches: Optional[int] = None):
+    """
+    Move archived habits' and dormant users' completions to cold storage.
+    Runs nightly, one transaction per batch.
+
+    Freed pages are reused by new completions after autovacuum; the files
+    themselves only shrink with VACUUM FULL or pg_repack.
+
+    Args:
+        batch_size: Habits per batch (defaults to ARCHIVE_BATCH_SIZE)
+        max_batches: Stop after this many batches (defaults to ARCHIVE_MAX_BATCHES)
+    """
+    logger.info("Archiving cold completion history...")
+    result = runtime.run_async(
+        _archive_cold_history(batch_size, max_batches or settings.ARCHIVE_MAX_BATCHES)
+    )
+    before, after = result["sizes_before"], result["sizes_after"]
+    logger.info(
+        f"Archived {result['completions']} completions from {result['habits']} habits "
+        f"in {result['elapsed_seconds']}s; completions indexes "
+        f"{before['completions_index_bytes']} -> {after['completions_index_bytes']} bytes"
+    )
+    return {"status": "completed", **result}
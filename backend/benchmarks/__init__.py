@@ -0,0 +1,3 @@
+"""
+Benchmark harness for the check-in, dashboard and nightly paths.
+"""
@@ -0,0 +1,141 @@
+"""
+Burst benchmark for the check-in write path.
+
+Fires one check-in per habit from a datagen manifest, `--concurrency` at
+a time, first with a transaction per check-in (direct) and then through
+the write-behind buffer with a flusher running. Records acknowledgement
+latency and, for write-behind, how long the flusher takes to drain.
+Requires a seeded Postgres and a running Redis; the check-in date's
+completions for the sampled habits are deleted before each mode.
+
+Usage:
+    python -m benchmarks.datagen --users 5000 --habits 3 --days 365 --seed-db
+    python -m benchmarks.checkin_burst --habits 3000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List
+from uuid import UUID
+from benchmarks.datagen import DEFAULT_MANIFEST, RESULTS_DIR
+from benchmarks.load_driver import git_revision
+
+
+async def reset(habit_ids: List[UUID], day: date) -> None:
+    """Remove the day's completions so every check-in is new."""
+    from sqlalchemy import delete
+    from app.database import get_sessionmaker
+    from app.models.completion import Completion
+    from app.services.streak_service import streak_service
+
+    async with get_sessionmaker()() as db:
+        await db.execute(delete(Completion).where(Completion.habit_id.in_(habit_ids), Completion.date == day))
+        await streak_service.recalculate_streaks(db, habit_ids, day)
+        await db.commit()
+
+
+async def burst(habit_ids: List[UUID], day: date, concurrency: int, write_behind: bool) -> Dict:
+    from app.cache import create_redis_client
+    from app.config import get_settings
+    from app.database import commit, get_sessionmaker
+    from app.models.habit import Habit
+    from app.services.checkin_buffer import checkin_buffer
+    from app.services.completion_service import completion_service
+    from app.worker import checkin_flusher
+
+    get_settings().CHECKIN_WRITE_BEHIND = write_behind
+    sessionmaker = get_sessionmaker()
+    redis = create_redis_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def check_in(habit_id: UUID) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            async with sessionmaker() as db:
+                habit = await db.get(Habit, habit_id)
+                await completion_service.check_in(db, habit, day, redis=redis, today=day)
+                await commit(db)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    stop = asyncio.Event()
+    flusher = None
+    if write_behind:
+        await checkin_buffer.ensure_group(redis)
+        flusher = asyncio.create_task(checkin_flusher.run("benchmark", stop))
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(check_in(habit_id) for habit_id in habit_ids))
+        acknowledged = time.perf_counter() - started
+
+        if write_behind:
+            while await checkin_buffer.backlog(redis):
+                await asyncio.sleep(0.01)
+        drained = time.perf_counter() - started
+    finally:
+        stop.set()
+        if flusher is not None:
+            await flusher
+        await redis.aclose()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "checkins": len(habit_ids),
+        "concurrency": concurrency,
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+        "checkins_per_second": round(len(habit_ids) / acknowledged, 1),
+        "drained_seconds": round(drained, 3),
+    }
+
+
+async def run(habit_ids: List[UUID], day: date, concurrency: int) -> Dict[str, Dict]:
+    from app.database import dispose_engine
+
+    modes = {}
+    try:
+        for name, write_behind in (("direct", False), ("write_behind", True)):
+            await reset(habit_ids, day)
+            modes[name] = await burst(habit_ids, day, concurrency, write_behind)
+    finally:
+        await dispose_engine()
+    return modes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare direct and write-behind check-ins under a burst")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    parser.add_argument("--habits", type=int, default=2000, help="Check-ins in the burst, one per habit")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--output", type=Path, help="Defaults to results/checkin-<revision>.json")
+    args = parser.parse_args()
+
+    manifest = json.loads(args.manifest.read_text())
+    habit_ids = [UUID(habit_id) for user in manifest["users"] for habit_id in user["habit_ids"]][:args.habits]
+    modes = asyncio.run(run(habit_ids, args.date, args.concurrency))
+
+    results = {
+        "kind": "checkin",
+        "revision": git_revision(),
+        "recorded_at": datetime.utcnow().isoformat(),
+        "modes": modes,
+    }
+    output = args.output or RESULTS_DIR / f"checkin-{results['revision']}.json"
+    output.write_text(json.dumps(results, indent=2))
+    for mode, entry in modes.items():
+        print(
+            f"{mode:<13} p50={entry['p50_ms']:>8}ms  p95={entry['p95_ms']:>8}ms  "
+            f"{entry['checkins_per_second']:>8}/s  drained in {entry['drained_seconds']}s"
+        )
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Size and speed benchmark for the completion cold storage tier.
+
+Archives a random fraction of habits in a seeded database, moves their
+history to cold storage in batches, and records the completions table
+and index sizes (after VACUUM FULL, so the numbers are comparable), the
+time of a typical hot-path query, and archive/restore throughput.
+Everything is restored and un-archived again at the end.
+
+Usage:
+    python -m benchmarks.datagen --users 5000 --habits 3 --days 365 --seed-db
+    python -m benchmarks.cold_storage --archive-fraction 0.3
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict
+from benchmarks.datagen import RESULTS_DIR
+from benchmarks.load_driver import git_revision
+
+# Last 30 days of active habits for one user: the dashboard's hot query
+HOT_QUERY = """
+    SELECT c.habit_id, count(*)
+    FROM completions c JOIN habits h ON h.id = c.habit_id
+    WHERE h.user_id = :user_id AND NOT h.is_archived AND c.date >= current_date - 30
+    GROUP BY c.habit_id
+"""
+
+
+async def measure(repeat: int) -> Dict:
+    """VACUUM FULL completions, then record sizes and hot query timing."""
+    from sqlalchemy import text
+    from app.database import get_engine, get_sessionmaker
+    from app.services.archive_service import archive_service
+
+    async with get_engine().connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text("VACUUM FULL ANALYZE completions"))
+
+    async with get_sessionmaker()() as db:
+        sizes = await archive_service.table_sizes(db)
+        user_ids = (await db.execute(text("SELECT id FROM users ORDER BY random() LIMIT :n"), {"n": repeat})).scalars().all()
+        timings = []
+        for user_id in user_ids:
+            started = time.perf_counter()
+            await db.execute(text(HOT_QUERY), {"user_id": user_id})
+            timings.append((time.perf_counter() - started) * 1000)
+
+    return {**sizes, "hot_query_ms": round(statistics.median(timings), 4)}
+
+
+async def run(fraction: float, batch_size: int, repeat: int) -> Dict:
+    from sqlalchemy import select, text
+    from app.database import dispose_engine, get_sessionmaker
+    from app.models.habit import Habit
+    from app.services.archive_service import archive_service
+
+    sessionmaker = get_sessionmaker()
+    try:
+        before = await measure(repeat)
+
+        async with sessionmaker() as db:
+            marked = (await db.execute(
+                text(
+                    "UPDATE habits SET is_archived = true, updated_at = :archived_at "
+                    "WHERE NOT is_archived AND random() < :fraction RETURNING id"
+                ),
+                {"fraction": fraction, "archived_at": datetime.utcnow() - timedelta(days=30)},
+            )).scalars().all()
+            await db.commit()
+
+        moved = 0
+        started = time.perf_counter()
+        async with sessionmaker() as db:
+            while True:
+                result = await archive_service.archive_batch(db, batch_size)
+                await db.commit()
+                if not result["habits"]:
+                    break
+                moved += result["completions"]
+        archive_seconds = time.perf_counter() - started
+
+        after = await measure(repeat)
+
+        started = time.perf_counter()
+        async with sessionmaker() as db:
+            cold = (await db.execute(select(Habit.id).where(Habit.history_archived_at.is_not(None)))).scalars().all()
+            restored = await archive_service.restore_habits(db, cold)
+            await db.execute(text("UPDATE habits SET is_archived = false WHERE id = ANY(:ids)"), {"ids": marked})
+            await db.commit()
+        restore_seconds = time.perf_counter() - started
+    finally:
+        await dispose_engine()
+
+    return {
+        "habits_archived": len(marked),
+        "completions_moved": moved,
+        "completions_restored": restored,
+        "archive_ms_per_habit": round(archive_seconds / max(len(cold), 1) * 1000, 4),
+        "restore_ms_per_habit": round(restore_seconds / max(len(cold), 1) * 1000, 4),
+        "before": before,
+        "after": after,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure completions size reduction from cold storage")
+    parser.add_argument("--archive-fraction", type=float, default=0.3)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200, help="Hot query samples per measurement")
+    parser.add_argument("--output", type=Path, help="Defaults to results/archive-<revision>.json")
+    args = parser.parse_args()
+
+    run_result = asyncio.run(run(args.archive_fraction, args.batch_size, args.repeat))
+    results = {
+        "kind": "archive",
+        "revision": git_revision(),
+        "recorded_at": datetime.utcnow().isoformat(),
+        **run_result,
+    }
+    output = args.output or RESULTS_DIR / f"archive-{results['revision']}.json"
+    output.write_text(json.dumps(results, indent=2))
+
+    before, after = results["before"], results["after"]
+    print(f"Moved {results['completions_moved']} completions from {results['habits_archived']} archived habits")
+    for key in ("completions_total_bytes", "completions_index_bytes", "archive_total_bytes", "hot_query_ms"):
+        print(f"{key:<26} {before[key]:>14}  ->  {after[key]:>14}")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
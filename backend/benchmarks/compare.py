@@ -0,0 +1,89 @@
+"""
+Diff two benchmark result files to spot regressions between commits.
+
+Understands pytest-benchmark JSON (`--benchmark-json`) as well as the
+load driver, stats pipeline, worker overhead, startup, check-in burst and
+cold storage output. Exits non-zero if any metric regressed by more than
+the threshold.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/micro-abc123.json benchmarks/results/micro-def456.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict
+
+
+def load_metrics(path: Path) -> Dict[str, float]:
+    """Flatten a result file into {metric name: value}, where lower is better."""
+    data = json.loads(path.read_text())
+
+    if data.get("kind") == "load":
+        metrics = {}
+        for name, scenario in data["scenarios"].items():
+            if "latency_ms" not in scenario:
+                continue
+            for pct in ("p50", "p95", "p99"):
+                metrics[f"{name}.{pct}_ms"] = scenario["latency_ms"][pct]
+        return metrics
+
+    if data.get("kind") == "stats":
+        return {f"batch_{run['batch_size']}.ms_per_user": run["ms_per_user"] for run in data["runs"]}
+
+    if data.get("kind") == "worker":
+        return {f"{mode}.mean_ms": entry["mean_ms"] for mode, entry in data["modes"].items()}
+
+    if data.get("kind") == "checkin":
+        return {
+            f"{mode}.{metric}": entry[metric]
+            for mode, entry in data["modes"].items()
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "drained_seconds")
+        }
+
+    if data.get("kind") == "archive":
+        return {
+            "after.completions_total_bytes": data["after"]["completions_total_bytes"],
+            "after.completions_index_bytes": data["after"]["completions_index_bytes"],
+            "after.hot_query_ms": data["after"]["hot_query_ms"],
+            "archive_ms_per_habit": data["archive_ms_per_habit"],
+            "restore_ms_per_habit": data["restore_ms_per_habit"],
+        }
+
+    if data.get("kind") == "startup":
+        return {f"{target}.median_ms": entry["median_ms"] for target, entry in data["targets"].items()}
+
+    # pytest-benchmark JSON
+    return {bench["fullname"]: bench["stats"]["median"] for bench in data.get("benchmarks", [])}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    baseline = load_metrics(args.baseline)
+    candidate = load_metrics(args.candidate)
+
+    regressions = 0
+    width = max((len(name) for name in baseline), default=10)
+    for name in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[name], candidate[name]
+        change = ((after - before) / before * 100) if before else 0.0
+        marker = ""
+        if change > args.threshold:
+            marker = "  REGRESSION"
+            regressions += 1
+        print(f"{name:<{width}}  {before:>12.6g}  {after:>12.6g}  {change:+7.1f}%{marker}")
+
+    for name in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{name:<{width}}  only in {'baseline' if name in baseline else 'candidate'}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Synthetic data generator for benchmarks and load tests.
+
+Builds N users x M habits x D days of completion history. The same
+dataset can be materialized as transient model instances (for the
+micro-benchmarks) or bulk-inserted into a local Postgres (for the
+load driver).
+
+Usage:
+    python -m benchmarks.datagen --users 1000 --habits 3 --days 365 --seed-db
+"""
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from faker import Faker
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_MANIFEST = RESULTS_DIR / "manifest.json"
+
+HABIT_NAMES = [
+    ("Morning Run", "🏃"),
+    ("Read 20 pages", "📚"),
+    ("Meditate", "🧘"),
+    ("Drink water", "💧"),
+    ("Journal", "📝"),
+    ("Stretch", "🤸"),
+    ("No sugar", "🍎"),
+    ("Practice guitar", "🎸"),
+]
+
+
+@dataclass
+class SyntheticDataset:
+    """Rows for users, habits and completions, keyed like the real tables."""
+    users: List[Dict] = field(default_factory=list)
+    habits: List[Dict] = field(default_factory=list)
+    completions: List[Dict] = field(default_factory=list)
+
+    @property
+    def habits_by_user(self) -> Dict[uuid.UUID, List[Dict]]:
+        grouped: Dict[uuid.UUID, List[Dict]] = {}
+        for habit in self.habits:
+            grouped.setdefault(habit["user_id"], []).append(habit)
+        return grouped
+
+
+def iter_completion_days(
+    rng: random.Random,
+    days: int,
+    today: date,
+    completion_rate: float,
+    freeze_rate: float,
+) -> Iterator[tuple]:
+    """
+    Yield (date, used_freeze) pairs for one habit.
+
+    Completions are sticky: a completed day makes the next one more likely,
+    which produces realistic runs instead of uniform noise.
+    """
+    completed_yesterday = False
+    for offset in range(days - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        chance = min(0.98, completion_rate + 0.15) if completed_yesterday else completion_rate
+        if rng.random() < chance:
+            completed_yesterday = True
+            yield day, False
+        elif completed_yesterday and rng.random() < freeze_rate:
+            yield day, True
+        else:
+            completed_yesterday = False
+
+
+def generate_dataset(
+    users: int,
+    habits: int,
+    days: int,
+    completion_rate: float = 0.75,
+    freeze_rate: float = 0.05,
+    seed: int = 42,
+    today: Optional[date] = None,
+) -> SyntheticDataset:
+    """
+    Generate a deterministic dataset of users x habits x days.
+
+    Habit counters (streaks, totals) are derived from the generated
+    completions so the rows are consistent with what the API would write.
+    """
+    from app.models import Theme, WeekStart
+    from app.services.streak_service import streak_service
+
+    fake = Faker()
+    Faker.seed(seed)
+    rng = random.Random(seed)
+    today = today or date.today()
+    now = datetime.utcnow()
+    created_at = now - timedelta(days=days)
+
+    dataset = SyntheticDataset()
+    for _ in range(users):
+        user_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+        dataset.users.append({
+            "id": user_id,
+            "keycloak_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "email": fake.unique.email(),
+            "display_name": fake.name(),
+            "is_premium": False,
+            "timezone": "UTC",
+            "week_starts_on": WeekStart.SUNDAY,
+            "theme": Theme.SYSTEM,
+            "notifications_enabled": True,
+            "reminder_time": "09:00",
+            "created_at": created_at,
+            "updated_at": now,
+        })
+
+        for name, icon in rng.sample(HABIT_NAMES, k=min(habits, len(HABIT_NAMES))):
+            habit_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            history = list(iter_completion_days(rng, days, today, completion_rate, freeze_rate))
+
+            for day, used_freeze in history:
+                completed_at = datetime.combine(day, datetime.min.time()) + timedelta(
+                    minutes=rng.randint(6 * 60, 23 * 60)
+                )
+                dataset.completions.append({
+                    "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                    "habit_id": habit_id,
+                    "date": day,
+                    "completed_at": completed_at,
+                    "used_freeze": used_freeze,
+                    "is_manual": not used_freeze,
+                    "note": fake.sentence() if rng.random() < 0.1 else None,
+                    "created_at": completed_at,
+                    "updated_at": completed_at,
+                })
+
+            current_streak = streak_service.calculate_current_streak(history, today)
+            completed_days = [day for day, used_freeze in history if not used_freeze]
+            dataset.habits.append({
+                "id": habit_id,
+                "user_id": user_id,
+                "name": name,
+                "icon": icon,
+                "color": fake.hex_color(),
+                "freeze_mode": True,
+                "freezes_available": rng.randint(0, 2),
+                "streak_goal": rng.choice([7, 14, 30, 50, 100]),
+                "current_streak": current_streak,
+                "best_streak": max(current_streak, streak_service.calculate_best_streak(history)),
+                "total_completions": len(completed_days),
+                "total_freezes_used": len(history) - len(completed_days),
+                "is_archived": False,
+                "created_at": created_at,
+                "updated_at": now,
+                "last_completed_at": (
+                    datetime.combine(completed_days[-1], datetime.min.time()) if completed_days else None
+                ),
+            })
+
+    return dataset
+
+
+def build_models(dataset: SyntheticDataset) -> Dict[str, list]:
+    """Materialize the dataset as transient (unsaved) model instances."""
+    from app.models import Completion, Habit, User
+
+    return {
+        "users": [User(**row) for row in dataset.users],
+        "habits": [Habit(**row) for row in dataset.habits],
+        "completions": [Completion(**row) for row in dataset.completions],
+    }
+
+
+async def seed_database(dataset: SyntheticDataset, chunk_size: int = 5000) -> None:
+    """Bulk-insert the dataset into the configured database."""
+    from sqlalchemy import insert
+    from app.database import dispose_engine, get_sessionmaker
+    from app.models import Completion, Habit, User
+
+    try:
+        async with get_sessionmaker()() as session:
+            for model, rows in (
+                (User, dataset.users),
+                (Habit, dataset.habits),
+                (Completion, dataset.completions),
+            ):
+                for start in range(0, len(rows), chunk_size):
+                    await session.execute(insert(model.__table__), rows[start:start + chunk_size])
+            await session.commit()
+    finally:
+        await dispose_engine()
+
+
+def write_manifest(dataset: SyntheticDataset, path: Path = DEFAULT_MANIFEST) -> Path:
+    """Write the user -> habit id mapping the load driver replays against."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    habits_by_user = dataset.habits_by_user
+    manifest = {
+        "users": [
+            {
+                "id": str(user["id"]),
+                "keycloak_id": user["keycloak_id"],
+                "habit_ids": [str(habit["id"]) for habit in habits_by_user.get(user["id"], [])],
+            }
+            for user in dataset.users
+        ],
+    }
+    path.write_text(json.dumps(manifest, indent=2))
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic Encore data")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--habits", type=int, default=3, help="Habits per user")
+    parser.add_argument("--days", type=int, default=365, help="Days of history per habit")
+    parser.add_argument("--completion-rate", type=float, default=0.75)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--seed-db", action="store_true", help="Insert rows into DATABASE_URL")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    args = parser.parse_args()
+
+    dataset = generate_dataset(
+        users=args.users,
+        habits=args.habits,
+        days=args.days,
+        completion_rate=args.completion_rate,
+        seed=args.seed,
+    )
+    print(
+        f"Generated {len(dataset.users)} users, {len(dataset.habits)} habits, "
+        f"{len(dataset.completions)} completions"
+    )
+
+    if args.seed_db:
+        asyncio.run(seed_database(dataset))
+        print("Seeded database")
+
+    print(f"Manifest written to {write_manifest(dataset, args.manifest)}")
+
+
+if __name__ == "__main__":
+    main()
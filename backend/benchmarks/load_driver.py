@@ -0,0 +1,230 @@
+"""
+Async load driver for the check-in and dashboard endpoints.
+
+Replays the users and habits from a datagen manifest against a running
+API (backed by a local Postgres and Redis) and records latency
+percentiles and throughput per scenario. Any response outside the
+scenario's expected statuses counts as an error, and a run where a
+scenario only ever got 404s (endpoint not mounted) is not saved.
+
+Check-ins are dated before the seeded history, walking backwards, so
+every one creates a new completion instead of hitting the duplicate path.
+
+Usage:
+    python -m benchmarks.datagen --users 500 --habits 3 --days 365 --seed-db
+    python -m benchmarks.load_driver --base-url http://localhost:8000 \\
+        --concurrency 100 --duration 60 --token "$ENCORE_BENCH_TOKEN"
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import httpx
+from benchmarks.datagen import DEFAULT_MANIFEST, RESULTS_DIR
+
+CHECKIN_PATH = "/api/v1/habits/{habit_id}/completions"
+DASHBOARD_PATH = "/api/v1/stats/overview"
+
+EXPECTED_STATUS = {
+    "checkin": {200, 201},
+    "dashboard": {200},
+}
+
+
+@dataclass
+class ScenarioStats:
+    """Latencies and error counts collected for one scenario."""
+    expected: Set[int]
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_codes: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, started: float, response: Optional[httpx.Response]) -> None:
+        self.latencies_ms.append((time.perf_counter() - started) * 1000)
+        if response is None:
+            self.errors += 1
+            return
+        self.status_codes[response.status_code] = self.status_codes.get(response.status_code, 0) + 1
+        if response.status_code not in self.expected:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict:
+        if not self.latencies_ms:
+            return {"requests": 0, "errors": self.errors}
+
+        ordered = sorted(self.latencies_ms)
+        return {
+            "requests": len(ordered),
+            "errors": self.errors,
+            "requests_per_second": round(len(ordered) / elapsed, 2),
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+            "latency_ms": {
+                "mean": round(statistics.fmean(ordered), 3),
+                "p50": round(_percentile(ordered, 50), 3),
+                "p95": round(_percentile(ordered, 95), 3),
+                "p99": round(_percentile(ordered, 99), 3),
+                "max": round(ordered[-1], 3),
+            },
+        }
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def unmounted_scenarios(results: Dict) -> List[str]:
+    """Scenarios whose every response was a 404, i.e. the route doesn't exist."""
+    return [
+        name
+        for name, scenario in results["scenarios"].items()
+        if scenario["requests"] and set(scenario.get("status_codes", {})) == {"404"}
+    ]
+
+
+def git_revision() -> str:
+    """Short hash of the checked-out commit, used to name result files."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    user: Dict,
+    deadline: float,
+    checkin_ratio: float,
+    stats: Dict[str, ScenarioStats],
+    first_date: date,
+    slot: int,
+    slots: int,
+) -> None:
+    """
+    Loop one simulated user: mostly dashboard reads, some check-ins.
+
+    Virtual users sharing a manifest user take interleaved dates
+    (`slot` of every `slots` days) so their check-ins never collide.
+    """
+    rng = random.Random(f"{user['id']}:{slot}")
+    checkins_per_habit: Dict[str, int] = {}
+
+    while time.perf_counter() < deadline:
+        if user["habit_ids"] and rng.random() < checkin_ratio:
+            scenario = "checkin"
+            habit_id = rng.choice(user["habit_ids"])
+            sequence = checkins_per_habit.get(habit_id, 0)
+            checkins_per_habit[habit_id] = sequence + 1
+            checkin_date = first_date - timedelta(days=sequence * slots + slot)
+            request = client.build_request(
+                "POST",
+                CHECKIN_PATH.format(habit_id=habit_id),
+                json={"date": checkin_date.isoformat()},
+            )
+        else:
+            scenario = "dashboard"
+            request = client.build_request("GET", DASHBOARD_PATH)
+
+        started = time.perf_counter()
+        try:
+            response = await client.send(request)
+        except httpx.HTTPError:
+            response = None
+        stats[scenario].record(started, response)
+
+
+async def run_load(
+    base_url: str,
+    manifest: Dict,
+    concurrency: int,
+    duration: float,
+    checkin_ratio: float,
+    token: Optional[str] = None,
+    history_days: int = 365,
+) -> Dict:
+    """Drive `concurrency` virtual users for `duration` seconds."""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    stats = {name: ScenarioStats(expected) for name, expected in EXPECTED_STATUS.items()}
+    users = manifest["users"]
+    first_date = date.today() - timedelta(days=history_days)
+    slots = -(-concurrency // len(users))
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            virtual_user(
+                client, users[i % len(users)], deadline, checkin_ratio, stats,
+                first_date, i // len(users), slots,
+            )
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "kind": "load",
+        "revision": git_revision(),
+        "recorded_at": datetime.utcnow().isoformat(),
+        "config": {
+            "base_url": base_url,
+            "concurrency": concurrency,
+            "duration": duration,
+            "checkin_ratio": checkin_ratio,
+            "history_days": history_days,
+            "users": len(users),
+        },
+        "scenarios": {name: scenario.summary(elapsed) for name, scenario in stats.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the check-in and dashboard endpoints")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--checkin-ratio", type=float, default=0.3)
+    parser.add_argument("--token", default=os.environ.get("ENCORE_BENCH_TOKEN"))
+    parser.add_argument(
+        "--history-days", type=int, default=365,
+        help="Days of seeded history (datagen --days); check-ins are dated before it",
+    )
+    parser.add_argument("--output", type=Path, help="Defaults to results/load-<revision>.json")
+    args = parser.parse_args()
+
+    manifest = json.loads(args.manifest.read_text())
+    results = asyncio.run(run_load(
+        base_url=args.base_url,
+        manifest=manifest,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        checkin_ratio=args.checkin_ratio,
+        token=args.token,
+        history_days=args.history_days,
+    ))
+
+    unmounted = unmounted_scenarios(results)
+    if unmounted:
+        print(json.dumps(results["scenarios"], indent=2))
+        raise SystemExit(f"Only 404s from {', '.join(unmounted)}; is the API router mounted? Results not saved.")
+
+    output = args.output or RESULTS_DIR / f"load-{results['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(json.dumps(results["scenarios"], indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
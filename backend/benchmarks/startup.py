@@ -0,0 +1,88 @@
+"""
+Cold-start benchmark and import-time profile for the app package.
+
+Each target runs in a fresh interpreter, the way a new pod, a recycled
+Celery child or an Alembic invocation would. Interpreter startup itself
+is measured separately and subtracted.
+
+Usage:
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+from benchmarks.datagen import RESULTS_DIR
+from benchmarks.load_driver import git_revision
+
+TARGETS = {
+    "api": "from app.main import create_app; create_app()",
+    "worker": "import app.worker.celery_app, app.worker.tasks",
+    "alembic": "import app.models; from app.config import settings; settings.DATABASE_URL",
+    "models": "import app.models",
+}
+
+
+def time_command(code: str, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def import_profile(code: str, top: int) -> List[Dict]:
+    """Slowest app.* modules by cumulative import time (-X importtime)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        check=True, capture_output=True, text=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        if name.startswith("app") and self_us.isdigit():
+            modules.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    return sorted(modules, key=lambda entry: entry["cumulative_ms"], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold start of the API, worker and Alembic")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="Modules to list per import profile")
+    parser.add_argument("--output", type=Path, help="Defaults to results/startup-<revision>.json")
+    args = parser.parse_args()
+
+    baseline = statistics.median(time_command("pass", args.runs))
+    targets = {}
+    for name, code in TARGETS.items():
+        timings = time_command(code, args.runs)
+        targets[name] = {
+            "median_ms": round(statistics.median(timings) - baseline, 1),
+            "min_ms": round(min(timings) - baseline, 1),
+            "import_profile": import_profile(code, args.top),
+        }
+
+    results = {
+        "kind": "startup",
+        "revision": git_revision(),
+        "recorded_at": datetime.utcnow().isoformat(),
+        "interpreter_ms": round(baseline, 1),
+        "targets": targets,
+    }
+    output = args.output or RESULTS_DIR / f"startup-{results['revision']}.json"
+    output.write_text(json.dumps(results, indent=2))
+    for name, entry in targets.items():
+        print(f"{name:<8} median={entry['median_ms']:>7} ms  min={entry['min_ms']:>7} ms")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Throughput benchmark for the batched user stats pipeline.
+
+Marks every user from a datagen manifest dirty, then drains the dirty
+set with `process_dirty_users` at each batch size and records users
+per second. Requires a seeded Postgres and a running Redis.
+
+Usage:
+    python -m benchmarks.datagen --users 5000 --habits 3 --days 365 --seed-db
+    python -m benchmarks.stats_pipeline --batch-sizes 50 200 500 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+from benchmarks.datagen import DEFAULT_MANIFEST, RESULTS_DIR
+from benchmarks.load_driver import git_revision
+
+
+async def drain(user_ids: List[str], batch_size: int) -> Dict:
+    """Mark all users dirty and process them in batches of `batch_size`."""
+    from app.cache import create_redis_client
+    from app.database import get_sessionmaker
+    from app.services.stats_service import DIRTY_USERS_KEY, stats_service
+
+    redis = create_redis_client()
+    try:
+        await redis.delete(DIRTY_USERS_KEY)
+        await redis.sadd(DIRTY_USERS_KEY, *user_ids)
+
+        batches = 0
+        started = time.perf_counter()
+        async with get_sessionmaker()() as db:
+            while True:
+                result = await stats_service.process_dirty_users(db, redis, batch_size)
+                if not result["processed"]:
+                    break
+                batches += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        await redis.aclose()
+
+    return {
+        "batch_size": batch_size,
+        "users": len(user_ids),
+        "batches": batches,
+        "elapsed_seconds": round(elapsed, 4),
+        "users_per_second": round(len(user_ids) / elapsed, 1),
+        "ms_per_user": round(elapsed / len(user_ids) * 1000, 4),
+    }
+
+
+async def run(user_ids: List[str], batch_sizes: List[int]) -> List[Dict]:
+    from app.database import dispose_engine
+
+    try:
+        return [await drain(user_ids, batch_size) for batch_size in batch_sizes]
+    finally:
+        await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure stats pipeline throughput")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[50, 200, 500, 1000])
+    parser.add_argument("--output", type=Path, help="Defaults to results/stats-<revision>.json")
+    args = parser.parse_args()
+
+    manifest = json.loads(args.manifest.read_text())
+    user_ids = [user["id"] for user in manifest["users"]]
+    runs = asyncio.run(run(user_ids, args.batch_sizes))
+
+    results = {
+        "kind": "stats",
+        "revision": git_revision(),
+        "recorded_at": datetime.utcnow().isoformat(),
+        "runs": runs,
+    }
+    output = args.output or RESULTS_DIR / f"stats-{results['revision']}.json"
+    output.write_text(json.dumps(results, indent=2))
+    for entry in runs:
+        print(f"batch={entry['batch_size']:>5}  {entry['users_per_second']:>10} users/s")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
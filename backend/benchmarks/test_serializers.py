@@ -0,0 +1,23 @@
+"""
+Micro-benchmarks for the model to_dict serializers used by the dashboard.
+"""
+
+
+def test_habit_to_dict(benchmark, dashboard_models):
+    habits = dashboard_models["habits"]
+    benchmark(lambda: [habit.to_dict() for habit in habits])
+
+
+def test_habit_to_dict_with_stats(benchmark, dashboard_models):
+    habits = dashboard_models["habits"]
+    benchmark(lambda: [habit.to_dict(include_stats=True) for habit in habits])
+
+
+def test_completion_to_dict(benchmark, dashboard_models):
+    completions = dashboard_models["completions"][:1000]
+    benchmark(lambda: [completion.to_dict() for completion in completions])
+
+
+def test_user_to_dict(benchmark, dashboard_models):
+    users = dashboard_models["users"]
+    benchmark(lambda: [user.to_dict() for user in users])
@@ -0,0 +1,37 @@
+"""
+Micro-benchmarks for streak computation.
+"""
+import random
+from datetime import date
+import pytest
+from app.services.streak_service import streak_service
+from benchmarks.datagen import iter_completion_days
+
+TODAY = date(2026, 1, 1)
+
+
+def _history(days: int, completion_rate: float) -> list:
+    rng = random.Random(days)
+    return list(iter_completion_days(rng, days, TODAY, completion_rate, freeze_rate=0.05))
+
+
+@pytest.mark.parametrize("days", [30, 365, 1825])
+def test_current_streak(benchmark, days):
+    history = _history(days, completion_rate=0.95)
+    benchmark(streak_service.calculate_current_streak, history, TODAY)
+
+
+@pytest.mark.parametrize("days", [30, 365, 1825])
+def test_best_streak(benchmark, days):
+    history = _history(days, completion_rate=0.75)
+    benchmark(streak_service.calculate_best_streak, history)
+
+
+def test_nightly_rollover(benchmark):
+    """Recompute current streaks for 1000 habits, as the nightly freeze check does."""
+    histories = [_history(365, completion_rate=0.8) for _ in range(1000)]
+
+    def rollover():
+        return [streak_service.calculate_current_streak(history, TODAY) for history in histories]
+
+    benchmark(rollover)
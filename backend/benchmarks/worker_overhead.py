@@ -0,0 +1,95 @@
+"""
+Per-task overhead of the Celery async bridge, before and after the
+persistent worker runtime.
+
+"per-task" mimics the old pattern: asyncio.run() with a fresh engine and
+connection per invocation. "persistent" reuses the worker runtime's loop
+and pool via run_async(). Both run the same trivial query, so the
+difference is pure bridging overhead. Requires a reachable DATABASE_URL.
+
+Usage:
+    python -m benchmarks.worker_overhead --iterations 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+from sqlalchemy import text
+from benchmarks.datagen import RESULTS_DIR
+from benchmarks.load_driver import git_revision
+
+
+def per_task_invocation() -> None:
+    from app.database import create_engine, create_sessionmaker
+
+    async def task() -> None:
+        engine = create_engine()
+        try:
+            async with create_sessionmaker(engine)() as db:
+                await db.execute(text("SELECT 1"))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(task())
+
+
+def persistent_invocation() -> None:
+    from app.worker import runtime
+
+    async def task() -> None:
+        async with runtime.session() as db:
+            await db.execute(text("SELECT 1"))
+
+    runtime.run_async(task())
+
+
+def measure(invoke: Callable[[], None], iterations: int) -> Dict:
+    timings: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        invoke()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure Celery async bridge overhead")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", type=Path, help="Defaults to results/worker-<revision>.json")
+    args = parser.parse_args()
+
+    from app.worker import runtime
+
+    persistent_invocation()  # warm the pool so setup isn't counted
+    modes = {
+        "per-task": measure(per_task_invocation, args.iterations),
+        "persistent": measure(persistent_invocation, args.iterations),
+    }
+    runtime.shutdown_worker_process()
+
+    results = {
+        "kind": "worker",
+        "revision": git_revision(),
+        "recorded_at": datetime.utcnow().isoformat(),
+        "modes": modes,
+    }
+    output = args.output or RESULTS_DIR / f"worker-{results['revision']}.json"
+    output.write_text(json.dumps(results, indent=2))
+    for name, entry in modes.items():
+        print(f"{name:<12} mean={entry['mean_ms']:>8} ms  p95={entry['p95_ms']:>8} ms")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Tests for completion cold storage: day bitmaps, unpacking and restore.
+"""
+import zlib
+from datetime import date, timedelta
+from uuid import uuid4
+import pytest
+from sqlalchemy import select
+from app.models import Completion, CompletionArchive, Habit
+from app.services.archive_service import REASON_ARCHIVED, archive_service, pack_days, unpack_days
+
+START = date(2026, 1, 1)
+
+
+def offsets(*days):
+    return [START + timedelta(days=day) for day in days]
+
+
+class TestPackDays:
+    def test_bit_offsets(self):
+        packed = pack_days(START, offsets(0, 7, 8, 15))
+        assert zlib.decompress(packed) == bytes([0b10000001, 0b10000001])
+
+    def test_round_trip_sorted(self):
+        days = offsets(40, 0, 3, 364, 9)
+        assert unpack_days(START, pack_days(START, days)) == sorted(days)
+
+    def test_empty(self):
+        packed = pack_days(START, [])
+        assert zlib.decompress(packed) == b""
+        assert unpack_days(START, packed) == []
+
+    def test_duplicates_collapse(self):
+        assert unpack_days(START, pack_days(START, offsets(2, 2))) == offsets(2)
+
+
+class TestUnpack:
+    def test_flags_and_notes(self):
+        habit_id = uuid4()
+        archive = CompletionArchive(
+            habit_id=habit_id,
+            start_date=START,
+            end_date=START + timedelta(days=9),
+            days=pack_days(START, offsets(0, 1, 9)),
+            freezes=pack_days(START, offsets(1)),
+            manual=pack_days(START, offsets(9)),
+            notes={(START + timedelta(days=9)).isoformat(): "late"},
+            completion_count=3,
+            reason=REASON_ARCHIVED,
+        )
+        rows = archive_service.unpack(archive)
+        assert [(row["date"], row["used_freeze"], row["is_manual"], row["note"]) for row in rows] == [
+            (START, False, False, None),
+            (START + timedelta(days=1), True, False, None),
+            (START + timedelta(days=9), False, True, "late"),
+        ]
+        assert all(row["habit_id"] == habit_id for row in rows)
+
+    def test_empty_freeze_and_manual_bitmaps(self):
+        archive = CompletionArchive(
+            habit_id=uuid4(),
+            start_date=START,
+            end_date=START + timedelta(days=2),
+            days=pack_days(START, offsets(0, 2)),
+            freezes=pack_days(START, []),
+            manual=pack_days(START, []),
+            notes=None,
+            completion_count=2,
+            reason=REASON_ARCHIVED,
+        )
+        rows = archive_service.unpack(archive)
+        assert [row["date"] for row in rows] == offsets(0, 2)
+        assert not any(row["used_freeze"] or row["is_manual"] or row["note"] for row in rows)
+
+
+class TestArchiveRoundTrip:
+    @pytest.mark.asyncio
+    async def test_restore_after_archive(self, db, user):
+        habit = Habit(user_id=user.id, name="Read", is_archived=True)
+        db.add(habit)
+        await db.flush()
+        history = [
+            (START, False, True, "first"),
+            (START + timedelta(days=1), True, False, None),
+            (START + timedelta(days=30), False, False, None),
+        ]
+        db.add_all(
+            Completion(habit_id=habit.id, date=day, used_freeze=freeze, is_manual=manual, note=note)
+            for day, freeze, manual, note in history
+        )
+        await db.flush()
+
+        moved = await archive_service.archive_habits(db, {habit.id: REASON_ARCHIVED})
+        assert moved == 3
+        assert await db.scalar(select(Completion.id).where(Completion.habit_id == habit.id)) is None
+        archive = await db.get(CompletionArchive, habit.id)
+        assert (archive.start_date, archive.end_date, archive.completion_count) == (START, START + timedelta(days=30), 3)
+        await db.refresh(habit)
+        assert habit.history_archived_at is not None
+
+        exported = await archive_service.export_history(db, habit)
+        assert [row["date"] for row in exported] == [day.isoformat() for day, *_ in history]
+        assert all(row["completed_at"] is None for row in exported)
+
+        restored = await archive_service.restore_habits(db, [habit.id])
+        assert restored == 3
+        result = await db.execute(
+            select(Completion.date, Completion.used_freeze, Completion.is_manual, Completion.note)
+            .where(Completion.habit_id == habit.id)
+            .order_by(Completion.date)
+        )
+        assert [tuple(row) for row in result.all()] == history
+        exported = await archive_service.export_history(db, habit)
+        assert [row["completed_at"] for row in exported] == [f"{day.isoformat()}T00:00:00" for day, *_ in history]
+        assert await db.scalar(select(CompletionArchive.habit_id).where(CompletionArchive.habit_id == habit.id)) is None
+        await db.refresh(habit)
+        assert habit.history_archived_at is None
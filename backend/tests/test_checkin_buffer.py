@@ -0,0 +1,133 @@
+"""
+Tests for the write-behind check-in buffer and its flusher.
+"""
+from datetime import date
+from uuid import uuid4
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models import Completion, Habit
+from app.services.checkin_buffer import (
+    CHECKIN_DEAD_LETTER_KEY,
+    CHECKIN_STREAM_KEY,
+    checkin_buffer,
+)
+from app.services.completion_service import completion_service
+from app.worker import checkin_flusher
+
+TODAY = date(2026, 10, 19)
+
+
+@pytest_asyncio.fixture
+async def buffer(redis):
+    await checkin_buffer.ensure_group(redis)
+    return redis
+
+
+class TestBuffer:
+    @pytest.mark.asyncio
+    async def test_append_dedupes_pending(self, buffer):
+        user_id, habit_id = uuid4(), uuid4()
+        assert await checkin_buffer.append(buffer, user_id, habit_id, TODAY)
+        assert not await checkin_buffer.append(buffer, user_id, habit_id, TODAY)
+        assert await checkin_buffer.get_pending(buffer, user_id) == {habit_id: {TODAY}}
+        assert await checkin_buffer.backlog(buffer) == 1
+
+    @pytest.mark.asyncio
+    async def test_read_and_acknowledge(self, buffer):
+        user_id, habit_id = uuid4(), uuid4()
+        await checkin_buffer.append(buffer, user_id, habit_id, TODAY, note="done")
+
+        checkins = await checkin_buffer.read(buffer, "flusher")
+        assert [(checkin.user_id, checkin.habit_id, checkin.date, checkin.note) for checkin in checkins] == [
+            (user_id, habit_id, TODAY, "done"),
+        ]
+
+        await checkin_buffer.acknowledge(buffer, checkins)
+        assert await checkin_buffer.backlog(buffer) == 0
+        assert await checkin_buffer.get_pending(buffer, user_id) == {}
+
+    @pytest.mark.asyncio
+    async def test_unparseable_entry_is_dead_lettered(self, buffer):
+        await buffer.xadd(CHECKIN_STREAM_KEY, {"user_id": "nope", "habit_id": "x", "date": "bad"})
+        await checkin_buffer.append(buffer, uuid4(), uuid4(), TODAY)
+
+        checkins = await checkin_buffer.read(buffer, "flusher")
+
+        assert len(checkins) == 1
+        [(_, dead)] = await buffer.xrange(CHECKIN_DEAD_LETTER_KEY)
+        assert dead["user_id"] == "nope"
+        assert dead["reason"].startswith("unparseable")
+        assert await checkin_buffer.backlog(buffer) == 1
+
+    @pytest.mark.asyncio
+    async def test_redelivered_entry_is_dead_lettered(self, buffer, monkeypatch):
+        monkeypatch.setattr(get_settings(), "CHECKIN_CLAIM_IDLE_MS", 0)
+        monkeypatch.setattr(get_settings(), "CHECKIN_MAX_DELIVERIES", 2)
+        user_id = uuid4()
+        await checkin_buffer.append(buffer, user_id, uuid4(), TODAY)
+
+        # Delivered, never acknowledged, then claimed again by another flusher
+        assert len(await checkin_buffer.read(buffer, "first")) == 1
+        assert len(await checkin_buffer.read(buffer, "second")) == 1
+        assert await checkin_buffer.read(buffer, "third") == []
+
+        [(_, dead)] = await buffer.xrange(CHECKIN_DEAD_LETTER_KEY)
+        assert dead["reason"] == "delivered 3 times"
+        assert await checkin_buffer.backlog(buffer) == 0
+        assert await checkin_buffer.get_pending(buffer, user_id) == {}
+
+
+@pytest.fixture
+def sessionmaker(db):
+    """Sessions on the test's connection, so their commits are rolled back too."""
+    return lambda: AsyncSession(bind=db.bind, expire_on_commit=False, join_transaction_mode="create_savepoint")
+
+
+async def add_habits(db, user, count):
+    habits = [Habit(user_id=user.id, name=f"Habit {index}") for index in range(count)]
+    db.add_all(habits)
+    await db.flush()
+    return habits
+
+
+class TestFlusher:
+    @pytest.mark.asyncio
+    async def test_flush_writes_and_acknowledges(self, db, buffer, user, sessionmaker):
+        [habit] = await add_habits(db, user, 1)
+        await checkin_buffer.append(buffer, user.id, habit.id, TODAY)
+        await checkin_buffer.append(buffer, uuid4(), habit.id, TODAY)  # Not the owner
+
+        assert await checkin_flusher.flush_once(sessionmaker, buffer, "flusher") == 2
+
+        dates = (await db.execute(select(Completion.date).where(Completion.habit_id == habit.id))).scalars().all()
+        assert dates == [TODAY]
+        assert await checkin_buffer.backlog(buffer) == 0
+        assert await checkin_buffer.get_pending(buffer, user.id) == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried_one_by_one(self, db, buffer, user, sessionmaker, monkeypatch):
+        good, bad = await add_habits(db, user, 2)
+        for habit in (good, bad):
+            await checkin_buffer.append(buffer, user.id, habit.id, TODAY)
+
+        log_buffered_completions = completion_service.log_buffered_completions
+
+        async def fail_for_bad(db, checkins, today=None):
+            if any(checkin.habit_id == bad.id for checkin in checkins):
+                raise RuntimeError("poison")
+            return await log_buffered_completions(db, checkins, today)
+
+        monkeypatch.setattr(completion_service, "log_buffered_completions", fail_for_bad)
+
+        assert await checkin_flusher.flush_once(sessionmaker, buffer, "flusher") == 2
+
+        written = (await db.execute(
+            select(Completion.habit_id).where(Completion.habit_id.in_([good.id, bad.id]))
+        )).scalars().all()
+        assert written == [good.id]
+        # The bad one stays pending, to be claimed again and eventually dead-lettered
+        assert await checkin_buffer.backlog(buffer) == 1
+        assert await checkin_buffer.get_pending(buffer, user.id) == {bad.id: {TODAY}}
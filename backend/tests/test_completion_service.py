@@ -0,0 +1,100 @@
+"""
+Tests for write-behind check-ins and their optimistic counters.
+"""
+from datetime import date, datetime, timedelta
+import pytest
+from app.config import get_settings
+from app.models import Completion, Habit
+from app.services.checkin_buffer import checkin_buffer
+from app.services.completion_service import completion_service
+
+TODAY = date(2026, 10, 19)
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+def habit_at(last=None, current=0, best=0, total=0):
+    """A transient habit with the given counters and last completion date."""
+    return Habit(
+        current_streak=current,
+        best_streak=best,
+        total_completions=total,
+        last_completed_at=datetime.combine(last, datetime.min.time()) if last else None,
+    )
+
+
+def days_ago(*offsets):
+    return {TODAY - timedelta(days=offset) for offset in offsets}
+
+
+class TestOverlay:
+    def test_nothing_pending(self):
+        assert completion_service._overlay(habit_at(YESTERDAY, 3, 5, 10), set(), TODAY) == (3, 5, 10)
+
+    def test_last_completion_is_not_new(self):
+        assert completion_service._overlay(habit_at(YESTERDAY, 3, 5, 10), {YESTERDAY}, TODAY) == (3, 5, 10)
+
+    def test_today_extends_live_streak(self):
+        assert completion_service._overlay(habit_at(YESTERDAY, 3, 5, 10), days_ago(0), TODAY) == (4, 5, 11)
+
+    def test_extends_past_best(self):
+        assert completion_service._overlay(habit_at(YESTERDAY, 5, 5, 10), days_ago(0), TODAY) == (6, 6, 11)
+
+    def test_consecutive_pending_days(self):
+        habit = habit_at(TODAY - timedelta(days=3), 2, 2, 10)
+        assert completion_service._overlay(habit, days_ago(2, 1, 0), TODAY) == (5, 5, 13)
+
+    def test_gap_restarts_streak(self):
+        habit = habit_at(TODAY - timedelta(days=5), 4, 4, 10)
+        assert completion_service._overlay(habit, days_ago(0), TODAY) == (1, 4, 11)
+
+    def test_first_ever_check_in(self):
+        assert completion_service._overlay(habit_at(), days_ago(0), TODAY) == (1, 1, 1)
+
+    def test_yesterday_only_keeps_streak_alive_today(self):
+        assert completion_service._overlay(habit_at(), days_ago(1), TODAY) == (1, 1, 1)
+
+    def test_run_ending_before_yesterday_is_not_current(self):
+        habit = habit_at(TODAY - timedelta(days=4), 0, 3, 10)
+        assert completion_service._overlay(habit, days_ago(3), TODAY) == (0, 3, 11)
+
+    def test_backfill_counts_toward_total_only(self):
+        habit = habit_at(YESTERDAY, 2, 2, 10)
+        assert completion_service._overlay(habit, days_ago(5), TODAY) == (2, 2, 11)
+
+
+class TestWriteBehindCheckIn:
+    @pytest.fixture(autouse=True)
+    def write_behind(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "CHECKIN_WRITE_BEHIND", True)
+
+    @pytest.mark.asyncio
+    async def test_new_day_is_pending(self, db, redis, user):
+        habit = Habit(user_id=user.id, name="Read", current_streak=1, best_streak=1, total_completions=1,
+                      last_completed_at=datetime.combine(YESTERDAY, datetime.min.time()))
+        db.add(habit)
+        await db.flush()
+
+        result = await completion_service.check_in(db, habit, TODAY, redis=redis, today=TODAY)
+        again = await completion_service.check_in(db, habit, TODAY, redis=redis, today=TODAY)
+
+        assert result["status"] == again["status"] == "pending"
+        assert (result["current_streak"], result["total_completions"]) == (2, 2)
+        assert again == result
+        assert await checkin_buffer.get_pending(redis, user.id) == {habit.id: {TODAY}}
+        assert await checkin_buffer.backlog(redis) == 1
+
+    @pytest.mark.asyncio
+    async def test_retap_of_stored_past_day_is_completed(self, db, redis, user):
+        earlier = TODAY - timedelta(days=3)
+        habit = Habit(user_id=user.id, name="Read", current_streak=1, best_streak=2, total_completions=3,
+                      last_completed_at=datetime.combine(YESTERDAY, datetime.min.time()))
+        db.add(habit)
+        await db.flush()
+        db.add(Completion(habit_id=habit.id, date=earlier))
+        await db.flush()
+
+        result = await completion_service.check_in(db, habit, earlier, redis=redis, today=TODAY)
+
+        assert result["status"] == "completed"
+        assert result["total_completions"] == 3
+        assert await checkin_buffer.backlog(redis) == 0
@@ -0,0 +1,52 @@
+"""
+Tests for post-commit callbacks.
+"""
+import pytest
+from sqlalchemy import text
+from app.database import after_commit, commit
+
+
+async def fail():
+    raise RuntimeError("redis down")
+
+
+class TestAfterCommit:
+    @pytest.mark.asyncio
+    async def test_runs_after_commit(self, db):
+        calls = []
+
+        async def record():
+            calls.append("ran")
+
+        await db.execute(text("SELECT 1"))
+        after_commit(db, record)
+        assert calls == []
+        await commit(db)
+        assert calls == ["ran"]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_logged_and_others_still_run(self, db, caplog):
+        calls = []
+
+        async def record():
+            calls.append("ran")
+
+        await db.execute(text("SELECT 1"))
+        after_commit(db, fail)
+        after_commit(db, record)
+        await commit(db)
+        assert calls == ["ran"]
+        assert "After-commit callback failed" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_dropped_on_rollback(self, db):
+        calls = []
+
+        async def record():
+            calls.append("ran")
+
+        await db.execute(text("SELECT 1"))
+        after_commit(db, record)
+        await db.rollback()
+        await commit(db)
+        assert calls == []
@@ -0,0 +1,114 @@
+"""
+Tests for import parsing, validation and the free-tier habit limit.
+"""
+import io
+from datetime import date
+import pytest
+from app.config import settings
+from app.services.import_service import (
+    ImportRowError,
+    import_service,
+    parse_generic_json,
+    parse_loop_csv,
+    validate_row,
+)
+
+TODAY = date(2026, 10, 19)
+
+
+class TestParseLoopCsv:
+    def test_manual_checks_and_skips_only(self):
+        source = io.StringIO(
+            "Date,Read,Run\n"
+            "2026-10-18,2,3\n"
+            "2026-10-17,1,0\n"
+            "2026-10-16,-1,2\n"
+        )
+        assert list(parse_loop_csv(source)) == [
+            (2, {"habit": "Read", "date": "2026-10-18", "freeze": False}),
+            (2, {"habit": "Run", "date": "2026-10-18", "freeze": True}),
+            (4, {"habit": "Run", "date": "2026-10-16", "freeze": False}),
+        ]
+
+    def test_blank_habit_column_ignored(self):
+        source = io.StringIO("Date,Read,\n2026-10-18,2,2\n")
+        assert [fields["habit"] for _, fields in parse_loop_csv(source)] == ["Read"]
+
+    def test_empty_file(self):
+        assert list(parse_loop_csv(io.StringIO(""))) == []
+
+
+class TestParseGenericJson:
+    def test_json_lines(self):
+        source = io.StringIO('{"habit": "Read", "date": "2026-10-18"}\n\n{"habit": "Run", "date": "2026-10-17"}\n')
+        assert [line for line, _ in parse_generic_json(source)] == [1, 3]
+
+    def test_leading_blank_lines_keep_line_numbers(self):
+        source = io.StringIO('\n\n{"habit": "Read", "date": "2026-10-18"}\nnot json\n')
+        rows = list(parse_generic_json(source))
+        assert rows[0] == (3, {"habit": "Read", "date": "2026-10-18"})
+        assert rows[1][0] == 4
+        assert rows[1][1]["_error"].startswith("invalid JSON")
+
+    def test_array(self):
+        source = io.StringIO('\n[{"habit": "Read", "date": "2026-10-18"}, 5]')
+        assert list(parse_generic_json(source)) == [
+            (1, {"habit": "Read", "date": "2026-10-18"}),
+            (2, {"_error": "expected a JSON object"}),
+        ]
+
+    def test_non_object_line(self):
+        assert list(parse_generic_json(io.StringIO("[1]\n"))) == [(1, {"_error": "expected a JSON object"})]
+
+    def test_blank_file(self):
+        assert list(parse_generic_json(io.StringIO("\n  \n"))) == []
+
+
+class TestValidateRow:
+    def test_valid_row(self):
+        row = validate_row({"habit": " Read ", "date": "2026-10-18T07:30:00", "freeze": "Yes", "note": "ok"}, TODAY)
+        assert (row.habit_name, row.date, row.used_freeze, row.note) == ("Read", date(2026, 10, 18), True, "ok")
+
+    def test_alternate_field_names(self):
+        row = validate_row({"habit_name": "Read", "date": "2026-10-18", "used_freeze": True}, TODAY)
+        assert row.habit_name == "Read" and row.used_freeze
+
+    def test_note_truncated(self):
+        assert len(validate_row({"habit": "Read", "date": "2026-10-18", "note": "x" * 600}, TODAY).note) == 500
+
+    @pytest.mark.parametrize("fields, message", [
+        ({"_error": "invalid JSON"}, "invalid JSON"),
+        ({"date": "2026-10-18"}, "missing habit name"),
+        ({"habit": "x" * 51, "date": "2026-10-18"}, "longer than 50"),
+        ({"habit": "Read", "date": "18/10/2026"}, "invalid date"),
+        ({"habit": "Read", "date": "2026-10-20"}, "in the future"),
+    ])
+    def test_invalid_rows(self, fields, message):
+        with pytest.raises(ImportRowError, match=message):
+            validate_row(fields, TODAY)
+
+
+class TestFreeTierLimit:
+    @pytest.mark.asyncio
+    async def test_new_habits_past_limit_are_skipped(self, db, user):
+        limit = settings.FREE_TIER_MAX_HABITS
+        rows = [(line, {"habit": f"Habit {line}", "date": "2026-10-18"}) for line in range(1, limit + 2)]
+        rows.append((limit + 2, {"habit": "habit 1", "date": "2026-10-17"}))
+
+        result = await import_service.import_rows(db, user, rows, today=TODAY)
+
+        assert result.habits_created == limit
+        assert result.completions_created == limit + 1
+        assert result.rows_invalid == 1
+        assert result.errors == [f"line {limit + 1}: habit limit reached, skipping 'Habit {limit + 1}'"]
+
+    @pytest.mark.asyncio
+    async def test_premium_has_no_limit(self, db, user):
+        user.is_premium = True
+        limit = settings.FREE_TIER_MAX_HABITS
+        rows = [(line, {"habit": f"Habit {line}", "date": "2026-10-18"}) for line in range(1, limit + 2)]
+
+        result = await import_service.import_rows(db, user, rows, today=TODAY)
+
+        assert result.habits_created == limit + 1
+        assert result.rows_invalid == 0
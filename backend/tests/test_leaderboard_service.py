@@ -0,0 +1,148 @@
+"""
+Tests for leaderboard keys, reads and rebuilds.
+"""
+from datetime import date, datetime
+import pytest
+from app.config import settings
+from app.models import Completion, Habit
+from app.services.leaderboard_service import (
+    TOUCHED_KEY,
+    LeaderboardMetric,
+    board_key,
+    group_members_key,
+    leaderboard_service,
+    week_id,
+)
+
+TODAY = date(2026, 10, 19)
+CURRENT = LeaderboardMetric.CURRENT_STREAK
+TOTAL = LeaderboardMetric.TOTAL_COMPLETIONS
+
+
+class TestKeys:
+    @pytest.mark.parametrize("day, expected", [
+        (date(2026, 10, 19), "2026-W43"),
+        (date(2026, 1, 1), "2026-W01"),
+        (date(2027, 1, 3), "2026-W53"),
+        (date(2024, 12, 30), "2025-W01"),
+    ])
+    def test_week_id_is_iso_week(self, day, expected):
+        assert week_id(day) == expected
+
+    def test_global_key(self):
+        assert board_key(CURRENT) == "leaderboard:current_streak:global"
+
+    def test_weekly_key(self):
+        assert board_key(TOTAL, "2026-W43") == "leaderboard:total_completions:weekly:2026-W43"
+
+    def test_weekly_only_for_completions(self):
+        with pytest.raises(ValueError):
+            board_key(CURRENT, "2026-W43")
+
+
+async def seed(redis, scores):
+    await redis.zadd(board_key(TOTAL), scores)
+
+
+class TestReads:
+    @pytest.mark.asyncio
+    async def test_rank_is_one_based_highest_first(self, redis):
+        await seed(redis, {"a": 5, "b": 9, "c": 1})
+        assert await leaderboard_service.get_rank(redis, "a", TOTAL) == {
+            "user_id": "a", "rank": 2, "score": 5, "total": 3,
+        }
+
+    @pytest.mark.asyncio
+    async def test_unranked_user(self, redis):
+        await seed(redis, {"a": 5})
+        assert await leaderboard_service.get_rank(redis, "z", TOTAL) is None
+
+    @pytest.mark.asyncio
+    async def test_top_pages(self, redis):
+        await seed(redis, {f"user{index}": index for index in range(10)})
+        first = await leaderboard_service.get_top(redis, TOTAL, limit=3)
+        second = await leaderboard_service.get_top(redis, TOTAL, offset=3, limit=3)
+        assert [(entry["user_id"], entry["rank"]) for entry in first] == [("user9", 1), ("user8", 2), ("user7", 3)]
+        assert [(entry["user_id"], entry["rank"]) for entry in second] == [("user6", 4), ("user5", 5), ("user4", 6)]
+        assert await leaderboard_service.get_top(redis, TOTAL, offset=9, limit=3) == [
+            {"user_id": "user0", "rank": 10, "score": 0},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_page_size_is_capped(self, redis):
+        await seed(redis, {f"user{index}": index for index in range(settings.LEADERBOARD_MAX_PAGE_SIZE + 5)})
+        page = await leaderboard_service.get_top(redis, TOTAL, limit=settings.LEADERBOARD_MAX_PAGE_SIZE + 5)
+        assert len(page) == settings.LEADERBOARD_MAX_PAGE_SIZE
+
+    @pytest.mark.asyncio
+    async def test_group_board_keeps_scores_of_members_only(self, redis):
+        await seed(redis, {"a": 5, "b": 9, "c": 1, "d": 7})
+        await leaderboard_service.set_group_members(redis, "friends", ["a", "c", "d", "nobody"])
+
+        top = await leaderboard_service.get_top(redis, TOTAL, group_id="friends")
+        assert [(entry["user_id"], entry["score"]) for entry in top] == [("d", 7), ("a", 5), ("c", 1)]
+        assert (await leaderboard_service.get_rank(redis, "a", TOTAL, group_id="friends"))["rank"] == 2
+        assert await leaderboard_service.get_rank(redis, "b", TOTAL, group_id="friends") is None
+
+        group_key = f"{board_key(TOTAL)}:group:friends"
+        assert 0 < await redis.ttl(group_key) <= settings.LEADERBOARD_GROUP_CACHE_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_group_membership_replaced(self, redis):
+        await leaderboard_service.set_group_members(redis, "friends", ["a", "b"])
+        await leaderboard_service.set_group_members(redis, "friends", ["c"])
+        assert await redis.smembers(group_members_key("friends")) == {"c"}
+
+
+class TestRebuild:
+    @pytest.mark.asyncio
+    async def test_rebuild_and_reapply_touched_users(self, db, redis, user, monkeypatch):
+        habit = Habit(user_id=user.id, name="Read", current_streak=2, best_streak=4, total_completions=6,
+                      last_completed_at=datetime(2026, 10, 19))
+        db.add(habit)
+        await db.flush()
+        db.add_all([Completion(habit_id=habit.id, date=TODAY), Completion(habit_id=habit.id, date=date(2026, 10, 18))])
+        await db.flush()
+        member = str(user.id)
+        weekly = board_key(TOTAL, week_id(TODAY))
+
+        reapplied = []
+        record_completions = leaderboard_service.record_completions
+
+        async def spy(db, redis, completions, today=None):
+            reapplied.extend(completions)
+            await record_completions(db, redis, completions, today)
+
+        # An incremental update lands while the weekly board is being built
+        zadd = redis.zadd
+
+        async def zadd_during_rebuild(key, mapping, *args, **kwargs):
+            if key == f"{weekly}:rebuild":
+                await redis.sadd(TOUCHED_KEY, member)
+            return await zadd(key, mapping, *args, **kwargs)
+
+        monkeypatch.setattr(redis, "zadd", zadd_during_rebuild)
+        monkeypatch.setattr(leaderboard_service, "record_completions", spy)
+
+        counts = await leaderboard_service.rebuild(db, redis, TODAY)
+
+        assert counts[weekly] >= 1
+        assert await redis.zscore(board_key(CURRENT), member) == 2
+        assert await redis.zscore(board_key(LeaderboardMetric.BEST_STREAK), member) == 4
+        assert await redis.zscore(board_key(TOTAL), member) == 6
+        # Sunday the 18th belongs to the previous ISO week
+        assert await redis.zscore(weekly, member) == 1
+        assert reapplied == [(user.id, TODAY)]
+        assert await redis.smembers(TOUCHED_KEY) == {member}
+
+    @pytest.mark.asyncio
+    async def test_lapsed_streak_ranks_zero(self, db, redis, user):
+        habit = Habit(user_id=user.id, name="Read", current_streak=5, best_streak=5, total_completions=5)
+        db.add(habit)
+        await db.flush()
+        db.add(Completion(habit_id=habit.id, date=date(2026, 10, 10)))
+        await db.flush()
+
+        scores = await leaderboard_service.user_scores(db, user.id, TODAY)
+        assert scores[CURRENT] == 0
+        assert scores[LeaderboardMetric.BEST_STREAK] == 5
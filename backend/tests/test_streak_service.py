@@ -0,0 +1,72 @@
+"""
+Tests for streak calculation rules.
+"""
+from datetime import date, timedelta
+from app.services.streak_service import streak_service
+
+TODAY = date(2026, 10, 19)
+
+
+def days_ago(*offsets, freeze=()):
+    """(date, used_freeze) pairs for the given day offsets before TODAY."""
+    return [(TODAY - timedelta(days=offset), offset in freeze) for offset in offsets]
+
+
+class TestCurrentStreak:
+    def test_empty_history(self):
+        assert streak_service.calculate_current_streak([], TODAY) == 0
+
+    def test_counts_consecutive_days_ending_today(self):
+        assert streak_service.calculate_current_streak(days_ago(0, 1, 2), TODAY) == 3
+
+    def test_today_missing_still_counts_yesterday(self):
+        assert streak_service.calculate_current_streak(days_ago(1, 2, 3), TODAY) == 3
+
+    def test_broken_when_yesterday_missing_too(self):
+        assert streak_service.calculate_current_streak(days_ago(2, 3, 4), TODAY) == 0
+
+    def test_gap_ends_streak(self):
+        assert streak_service.calculate_current_streak(days_ago(0, 1, 3, 4, 5), TODAY) == 2
+
+    def test_freeze_in_middle_extends_without_counting(self):
+        history = days_ago(0, 1, 2, 3, freeze=(2,))
+        assert streak_service.calculate_current_streak(history, TODAY) == 3
+
+    def test_freeze_at_head_keeps_streak_alive(self):
+        history = days_ago(0, 1, 2, freeze=(0,))
+        assert streak_service.calculate_current_streak(history, TODAY) == 2
+
+    def test_freeze_at_head_yesterday_with_today_missing(self):
+        history = days_ago(1, 2, 3, freeze=(1,))
+        assert streak_service.calculate_current_streak(history, TODAY) == 2
+
+    def test_only_freezes(self):
+        history = days_ago(0, 1, freeze=(0, 1))
+        assert streak_service.calculate_current_streak(history, TODAY) == 0
+
+    def test_order_does_not_matter(self):
+        assert streak_service.calculate_current_streak(list(reversed(days_ago(0, 1, 2))), TODAY) == 3
+
+
+class TestBestStreak:
+    def test_empty_history(self):
+        assert streak_service.calculate_best_streak([]) == 0
+
+    def test_longest_run_wins(self):
+        history = days_ago(0, 1, 5, 6, 7, 8, 12)
+        assert streak_service.calculate_best_streak(history) == 4
+
+    def test_gap_splits_runs(self):
+        assert streak_service.calculate_best_streak(days_ago(0, 2, 4)) == 1
+
+    def test_freeze_bridges_run_without_counting(self):
+        history = days_ago(0, 1, 2, 3, 4, freeze=(2,))
+        assert streak_service.calculate_best_streak(history) == 4
+
+    def test_freeze_at_head_and_tail(self):
+        history = days_ago(0, 1, 2, 3, freeze=(0, 3))
+        assert streak_service.calculate_best_streak(history) == 2
+
+    def test_unsorted_input(self):
+        history = days_ago(8, 0, 7, 1, 6)
+        assert streak_service.calculate_best_streak(history) == 3